@@ -0,0 +1,12 @@
+"""Python wrapper of a gateway rest API of a flespi platform."""
+
+
+__all__ = ['Device', 'FlespiAPIError']
+
+
+def __getattr__(name):
+    # Resolved on first access so that importing the package stays cheap.
+    if name in __all__:
+        from . import gateway
+        return getattr(gateway, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,344 @@
+"""Asynchronous counterpart of :mod:`flespi_gateway.gateway` built on top of
+`aiohttp <https://docs.aiohttp.org>`_.
+
+Requests to independent endpoints of a device are issued concurrently, so
+refreshing telemetry, snapshots and logs costs a single network round-trip
+instead of three sequential ones. :class:`AsyncDevice` provides the same
+``get_*`` methods as :class:`flespi_gateway.gateway.Device`, returning the
+``result`` part of every response.
+
+The module requires the optional ``aiohttp`` dependency which can be installed
+with ``python3 -m pip install flespi-gateway[async]``.
+
+"""
+
+
+import asyncio
+import logging
+from urllib.parse import urlencode
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .cache import MemoryCache
+from .gateway import (
+    _ENDPOINTS, BASE_URL, DEFAULT_TIME_WINDOW_PARAMS, DEFAULT_TIMEOUT,
+    _api_error, _build_headers, _conditional_headers, _encode_params, _loads,
+    _revalidated_content)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDevice:
+    """Asynchronous version of :class:`flespi_gateway.gateway.Device`.
+
+    The underlying ``aiohttp.ClientSession`` is created lazily on the first request,
+    so the object can be constructed outside of a running event loop.
+
+    Parameters
+    ----------
+    device_number : int
+        The unique identifier for the device within the Flespi platform.
+    flespi_token : str
+        A valid Flespi token for authentication with the Flespi API.
+    timeout : tuple of float, optional
+        Connect and read timeouts in seconds of every request. Defaults to ``DEFAULT_TIMEOUT``.
+
+    Raises
+    ------
+    TypeError
+        If `device_number` is not an integer or `flespi_token` is not a string.
+    ValueError
+        If `flespi_token` is not exactly 64 characters long.
+    ImportError
+        If ``aiohttp`` is not installed.
+
+    Examples
+    --------
+    >>> async def refresh():
+    ...     async with AsyncDevice(device_number=123456, flespi_token=flespi_token) as device:
+    ...         return await device.get_all()
+    >>> telemetry, snapshots, logs = asyncio.run(refresh())
+    """
+
+    def __init__(self, device_number, flespi_token, timeout=DEFAULT_TIMEOUT):
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncDevice requires aiohttp: python3 -m pip install flespi-gateway[async]")
+        if not isinstance(device_number, int):
+            raise TypeError("Device number must be an integer!")
+        if not isinstance(flespi_token, str):
+            raise TypeError("Token must be a string!")
+        if len(flespi_token) != 64:
+            raise ValueError("Token must be 64 characters long!")
+
+        self.device_number = device_number
+        self.flespi_token = flespi_token
+        self.timeout = timeout
+        self.headers = _build_headers(self.flespi_token)
+        self.base_url = BASE_URL
+        self._device_base = f"{self.base_url}{self.device_number}/"
+        self._urls = {name: self._device_base + path for name, path in _ENDPOINTS.items()}
+        self._urls.update({'self': self._device_base[:-1], 'all': f"{self.base_url}all"})
+        self._session = None
+        self._inflight = {}
+        # Last ETag, Last-Modified and body per revalidated request, used for conditional requests.
+        self._validators = MemoryCache(maxsize=128)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying HTTP session if it was opened."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(sock_connect=self.timeout[0], sock_read=self.timeout[1]))
+        return self._session
+
+    async def _get(self, link, params=None, revalidate=False):
+        """Perform a GET request to `link` and return the ``result`` part of the response.
+
+        Identical requests issued while one is in flight share its response. With
+        `revalidate`, the response is stored for conditional requests, like those
+        of the endpoints :class:`flespi_gateway.gateway.Device` caches.
+        """
+        key = f"{link}?{urlencode(sorted(dict(params).items()))}" if params else link
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(link, params, key, revalidate))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, link, params, key, revalidate):
+        if params is not None:
+            params = dict(params)
+        validators = self._validators if revalidate else None
+        validator = validators.get_stale(key) if validators is not None else None
+        headers = _conditional_headers(validator) if validator else None
+        async with self._get_session().get(link, params=params, headers=headers) as response:
+            content = await response.read()
+            if response.status not in (200, 304):
+                raise _api_error(response.status, content)
+            content = _revalidated_content(validators, key, validator, response.status,
+                                           content, response.headers)
+        return _loads(content)['result']
+
+    async def get_devices(self, all=False):
+        """Retrieve the device itself or, with `all` set, all devices of the account.
+
+        See :meth:`flespi_gateway.gateway.Device.get_devices`.
+        """
+        return await self._get(self._urls['all'] if all else self._urls['self'], revalidate=True)
+
+    async def get_messages(self, params=None):
+        """Retrieve messages accumulated in the device storage.
+
+        See :meth:`flespi_gateway.gateway.Device.get_messages`.
+        """
+        return await self._get(self._urls['messages'], params=_encode_params(params))
+
+    async def get_telemetry(self):
+        """Retrieve the latest telemetry fields for the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_telemetry`.
+        """
+        return await self._get(self._urls['telemetry'], revalidate=True)
+
+    async def get_connections(self):
+        """Retrieve the current connections of the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_connections`.
+        """
+        return await self._get(self._urls['connections'], revalidate=True)
+
+    async def get_snapshots(self):
+        """List archived messages snapshots available for the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_snapshots`.
+        """
+        return await self._get(self._urls['snapshots'], revalidate=True)
+
+    async def get_logs(self, params=None):
+        """Fetch logs for the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_logs`.
+        """
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return await self._get(self._urls['logs'], params=_encode_params(params), revalidate=True)
+
+    async def get_packets(self, params=None):
+        """Fetch raw packets received from the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_packets`.
+        """
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return await self._get(self._urls['packets'], params=_encode_params(params))
+
+    async def get_settings(self):
+        """Retrieve all settings of the device.
+
+        See :meth:`flespi_gateway.gateway.Device.get_settings`.
+        """
+        return await self._get(self._urls['settings'], revalidate=True)
+
+    async def get_all(self):
+        """Concurrently fetch telemetry, snapshots and logs of the device.
+
+        Returns
+        -------
+        results : list
+            The ``result`` parts of telemetry, snapshots and logs responses, in this order.
+        """
+        return await asyncio.gather(
+            self.get_telemetry(), self.get_snapshots(), self.get_logs())
+
+    async def snapshot_bundle(self):
+        """Concurrently fetch the complete current state of the device.
+
+        Returns
+        -------
+        results : list
+            The ``result`` parts of telemetry, logs, snapshots and settings responses, in this order.
+
+        Examples
+        --------
+        >>> async with AsyncDevice(device_number=123456, flespi_token=flespi_token) as device:
+        ...     telemetry, logs, snapshots, settings = await device.snapshot_bundle()
+        """
+        return await asyncio.gather(
+            self.get_telemetry(), self.get_logs(), self.get_snapshots(), self.get_settings())
+
+    async def gather_all(self):
+        """Concurrently fetch every endpoint of the device.
+
+        Messages, logs and packets are requested with their default parameters.
+
+        Returns
+        -------
+        results : dict
+            The ``result`` part of each response keyed by ``'devices'``, ``'messages'``,
+            ``'telemetry'``, ``'connections'``, ``'snapshots'``, ``'logs'``, ``'packets'``
+            and ``'settings'``.
+
+        Examples
+        --------
+        >>> async with AsyncDevice(device_number=123456, flespi_token=flespi_token) as device:
+        ...     results = await device.gather_all()
+        >>> print(results['telemetry'])
+        [{'id': 123456, 'telemetry': {...}}]
+        """
+        coroutines = {
+            'devices': self.get_devices(),
+            'messages': self.get_messages(),
+            'telemetry': self.get_telemetry(),
+            'connections': self.get_connections(),
+            'snapshots': self.get_snapshots(),
+            'logs': self.get_logs(),
+            'packets': self.get_packets(),
+            'settings': self.get_settings(),
+        }
+        return dict(zip(coroutines, await asyncio.gather(*coroutines.values())))
+
+
+def fetch_all(device_number, flespi_token):
+    """Synchronous wrapper around :meth:`AsyncDevice.get_all`.
+
+    Parameters
+    ----------
+    device_number : int
+        The unique identifier for the device within the Flespi platform.
+    flespi_token : str
+        A valid Flespi token for authentication with the Flespi API.
+
+    Returns
+    -------
+    results : list
+        The ``result`` parts of telemetry, snapshots and logs responses, in this order.
+    """
+    async def _run():
+        async with AsyncDevice(device_number, flespi_token) as device:
+            return await device.get_all()
+    return asyncio.run(_run())
+
+
+async def gather_telemetry(device_numbers, flespi_token, concurrency=64, timeout=DEFAULT_TIMEOUT):
+    """Concurrently fetch telemetry of many devices.
+
+    Every device is requested separately, with at most `concurrency` requests
+    in flight over a shared pool of keep-alive connections. A failed request
+    only affects its own device.
+
+    Parameters
+    ----------
+    device_numbers : iterable of int
+        Unique identifiers of the devices within the Flespi platform.
+    flespi_token : str
+        A valid Flespi token for authentication with the Flespi API.
+    concurrency : int, optional
+        Maximum number of simultaneous requests. Defaults to 64.
+    timeout : tuple of float, optional
+        Connect and read timeouts in seconds. Defaults to ``DEFAULT_TIMEOUT``.
+
+    Returns
+    -------
+    telemetry : dict
+        The ``result`` part of each telemetry response keyed by device number,
+        None for devices whose request was unsuccessful, failed or timed out.
+
+    See Also
+    --------
+    flespi_gateway.gateway.get_telemetry_batch : Fetches up to 100 devices per request with a multi-device selector.
+    """
+    if aiohttp is None:
+        raise ImportError(
+            "gather_telemetry requires aiohttp: python3 -m pip install flespi-gateway[async]")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(session, device_number):
+        link = f"{BASE_URL}{device_number}/{_ENDPOINTS['telemetry']}"
+        async with semaphore:
+            try:
+                async with session.get(link) as response:
+                    if response.status != 200:
+                        logger.error("Unsuccessful request for device %s. Status code: %s",
+                                     device_number, response.status)
+                        return device_number, None
+                    return device_number, _loads(await response.read())['result']
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Request for device %s failed: %r", device_number, e)
+                return device_number, None
+
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    async with aiohttp.ClientSession(headers=_build_headers(flespi_token), connector=connector,
+                                     timeout=client_timeout) as session:
+        return dict(await asyncio.gather(*(_one(session, number) for number in device_numbers)))
+
+
+def get_telemetry_many(device_numbers, flespi_token, concurrency=64, timeout=DEFAULT_TIMEOUT):
+    """Synchronous wrapper around :func:`gather_telemetry`.
+
+    Examples
+    --------
+    >>> telemetry = get_telemetry_many([123456, 654321], flespi_token=flespi_token)
+    >>> print(telemetry[123456])
+    [{'id': 123456, 'telemetry': {...}}]
+    """
+    return asyncio.run(gather_telemetry(
+        device_numbers, flespi_token, concurrency=concurrency, timeout=timeout))
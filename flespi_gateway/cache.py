@@ -0,0 +1,281 @@
+"""Response caches used by :class:`flespi_gateway.gateway.Device`.
+
+Flespi endpoints such as telemetry are usually polled far more often than the
+underlying data changes. Cached responses are kept as raw JSON bytes, so every
+hit is decoded into a fresh object and callers can never modify a shared result.
+
+Any object implementing the :class:`CacheBackend` interface can be passed to
+``Device(cache=...)``. :class:`RedisBackend` shares cached responses between
+processes, e.g. web application or Celery workers polling the same devices,
+and :class:`SQLiteBackend` keeps them on disk across restarts of scripts and
+notebooks.
+
+"""
+
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Interface of a response cache used by :class:`flespi_gateway.gateway.Device`.
+
+    Keys are strings and values are raw response bodies (bytes).
+    """
+
+    def get(self, key):
+        """Return the value stored under `key` or None if it is missing or expired."""
+        raise NotImplementedError
+
+    def setex(self, key, ttl, value):
+        """Store `value` under `key` for `ttl` seconds."""
+        raise NotImplementedError
+
+    def get_stale(self, key):
+        """Return the value stored under `key` regardless of its expiration, if the backend keeps it."""
+        return None
+
+    def delete(self, key):
+        """Remove the value stored under `key`, if any."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        """Remove all values stored under keys starting with `prefix`."""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache where every entry has its own time to live.
+
+    Expired entries are not evicted eagerly: they stay available through
+    :meth:`get_stale` until pushed out by newer entries, which allows serving
+    the last known response when flespi.io cannot be reached.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of entries kept in the cache. Defaults to 128.
+
+    Examples
+    --------
+    >>> cache = MemoryCache(maxsize=16)
+    >>> cache.setex('telemetry', 2.0, b'{"result": []}')
+    >>> cache.get('telemetry')
+    b'{"result": []}'
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value stored under `key` or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            generated_at, ttl, value = entry
+            if time.monotonic() - generated_at >= ttl:
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_stale(self, key):
+        """Return the value stored under `key` regardless of its expiration."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[2]
+
+    def setex(self, key, ttl, value):
+        """Store `value` under `key` for `ttl` seconds."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove the value stored under `key`, if any."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Remove all values stored under keys starting with `prefix`."""
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend(CacheBackend):
+    """Cache backend storing responses in `Redis <https://redis.io>`_.
+
+    Parameters
+    ----------
+    client : redis.Redis
+        Connected Redis client, e.g. ``redis.Redis(host='localhost')``.
+    prefix : str, optional
+        Prefix prepended to every key. Defaults to ``'flespi:'``.
+
+    Examples
+    --------
+    >>> import redis
+    >>> cache = RedisBackend(redis.Redis(host='localhost', port=6379))
+    >>> device = Device(device_number=123456, flespi_token=flespi_token, cache=cache)
+    """
+
+    def __init__(self, client, prefix='flespi:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def setex(self, key, ttl, value):
+        # Millisecond precision keeps sub-second TTLs meaningful.
+        self.client.psetex(self.prefix + key, max(int(ttl * 1000), 1), value)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def delete_prefix(self, prefix):
+        pattern = re.sub(r'([*?\[\]\\])', r'\\\1', self.prefix + prefix) + '*'
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+
+
+class TieredBackend(CacheBackend):
+    """Two-level cache with a short-lived in-process L1 in front of a shared L2.
+
+    Hot keys are served from process memory without a network hop to the L2
+    backend, cross-process hits are served by L2 and only genuine misses reach
+    flespi.io. An entry may outlive its L2 expiration by at most `l1_ttl` seconds.
+
+    Parameters
+    ----------
+    l2 : CacheBackend
+        Shared backend, usually a :class:`RedisBackend`.
+    l1 : CacheBackend, optional
+        In-process backend. Defaults to ``MemoryCache(maxsize=128)``.
+    l1_ttl : float, optional
+        Upper bound in seconds for keeping entries in L1. Defaults to 1.0.
+
+    Examples
+    --------
+    >>> cache = TieredBackend(RedisBackend(redis.Redis()))
+    >>> device = Device(device_number=123456, flespi_token=flespi_token, cache=cache)
+    """
+
+    def __init__(self, l2, l1=None, l1_ttl=1.0):
+        self.l1 = l1 if l1 is not None else MemoryCache(maxsize=128)
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+
+    def get(self, key):
+        value = self.l1.get(key)
+        if value is None:
+            value = self.l2.get(key)
+            if value is not None:
+                self.l1.setex(key, self.l1_ttl, value)
+        return value
+
+    def setex(self, key, ttl, value):
+        self.l1.setex(key, min(ttl, self.l1_ttl), value)
+        self.l2.setex(key, ttl, value)
+
+    def get_stale(self, key):
+        value = self.l1.get_stale(key)
+        return value if value is not None else self.l2.get_stale(key)
+
+    def delete(self, key):
+        self.l2.delete(key)
+        self.l1.delete(key)
+
+    def delete_prefix(self, prefix):
+        self.l2.delete_prefix(prefix)
+        self.l1.delete_prefix(prefix)
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache backend persisting responses in a local SQLite database.
+
+    Entries survive restarts of the process, so repeated runs of a script or
+    notebook are served from disk while fresh, and expired entries remain
+    available via :meth:`get_stale` when flespi.io cannot be reached, until
+    the entries expiring first are pruned to keep at most `maxsize` of them.
+
+    Parameters
+    ----------
+    path : str, optional
+        Path of the database file, created if missing. Defaults to ``'~/.flespi_cache.sqlite'``.
+    maxsize : int, optional
+        Maximum number of entries kept in the database. Defaults to 1024.
+
+    Examples
+    --------
+    >>> cache = SQLiteBackend('~/.flespi_cache.sqlite')
+    >>> device = Device(device_number=123456, flespi_token=flespi_token, cache=cache, cache_ttl=300)
+    """
+
+    def __init__(self, path='~/.flespi_cache.sqlite', maxsize=1024):
+        # Imported here, so that importing the package does not load sqlite3.
+        import sqlite3
+        self.path = os.path.expanduser(path)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)')
+
+    def _select(self, key):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT expires_at, value FROM responses WHERE key = ?', (key,)).fetchone()
+
+    def get(self, key):
+        row = self._select(key)
+        # Wall-clock time, as entries outlive the process that stored them.
+        if row is None or row[0] <= time.time():
+            return None
+        return row[1]
+
+    def get_stale(self, key):
+        row = self._select(key)
+        return None if row is None else row[1]
+
+    def setex(self, key, ttl, value):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                (key, time.time() + ttl, value))
+            self._connection.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.maxsize,))
+
+    def delete(self, key):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def delete_prefix(self, prefix):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'DELETE FROM responses WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -10,12 +10,294 @@ dedicated long-term storage, access to telemetry.
 More information on `devices <https://flespi.com/flespi-devices>`_ can be
 found on official webpage of a platform.
 
+The ``iter_*`` methods parse responses while they are being received, keeping
+a single item in memory at a time. They require the optional ``ijson``
+dependency, ``python3 -m pip install flespi-gateway[stream]``, and use its
+yajl2 C backend when it is available, falling back to the pure Python one.
+
 """
 
 
+import contextlib
+import hashlib
 import logging
-import json
-import requests
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from types import MappingProxyType
+from urllib.parse import urlencode
+
+from .cache import MemoryCache
+
+
+def _json_default(obj):
+    # NumPy scalars and arrays not handled natively by the encoder.
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        # Accepts integer keys and NumPy values, e.g. from vectorized timestamp conversions.
+        return orjson.dumps(obj, default=_json_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    import json
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'), default=_json_default)
+
+
+def _encode_params(params):
+    """Encode request parameters into the ``data`` query parameter expected by flespi.io.
+
+    `params` may be a mapping or a sequence of key and value pairs. Parameters
+    that already carry an encoded ``data`` string are passed through.
+    """
+    if params is None:
+        return None
+    params = dict(params)
+    if isinstance(params.get('data'), str):
+        return params
+    return {'data': _dumps(params)}
+
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+else:
+    try:
+        _ijson_backend = ijson.get_backend('yajl2_c')
+    except ImportError:
+        _ijson_backend = ijson
+
+# Never advertise brotli when responses encoded with it cannot be decoded.
+# HTTP clients decode it with either brotli or its PyPy-friendly brotlicffi port.
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = 'br, gzip, deflate'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _ACCEPT_ENCODING = 'br, gzip, deflate'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+
+__all__ = ['Device', 'FlespiAPIError', 'batch_get', 'create_session', 'get_telemetry_batch']
+
+logger = logging.getLogger(__name__)
+
+# Root of the device endpoints of the gateway API.
+BASE_URL = "https://flespi.io/gw/devices/"
+
+# (connect, read) timeouts in seconds applied to every request.
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Size in bytes of network reads when responses are streamed.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Size in bytes of blocks written to disk when snapshots are downloaded.
+SNAPSHOT_CHUNK_SIZE = 1024 * 1024
+
+# Retries of failed requests and connections kept open per host by the shared sessions.
+MAX_RETRIES = 5
+POOL_MAXSIZE = 64
+
+# Maximum number of devices addressed by a single multi-device request.
+BATCH_SIZE = 100
+
+# Read-only default time window of logs and packets requests.
+DEFAULT_TIME_WINDOW_PARAMS = MappingProxyType({'data': _dumps({'from': 1702303046, 'to': 1702317898})})
+
+# Paths of the fixed endpoints of a device, relative to its URL.
+_ENDPOINTS = {
+    'messages': 'messages',
+    'telemetry': 'telemetry/all',
+    'connections': 'connections/all',
+    'snapshots': 'snapshots',
+    'logs': 'logs',
+    'packets': 'packets',
+    'settings': 'settings/all',
+}
+_ENDPOINT_NAMES = {path: name for name, path in _ENDPOINTS.items()}
+
+# Seconds for which responses of frequently polled endpoints are served from cache.
+CACHE_TTLS = {
+    'telemetry': 2.0,
+    'connections': 2.0,
+    'snapshots': 10.0,
+    'logs': 30.0,
+    'devices': 60.0,
+    'settings': 60.0,
+}
+
+
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def create_session(transport='requests', max_retries=MAX_RETRIES, pool_maxsize=POOL_MAXSIZE):
+    """
+    Create an HTTP session configured like the one shared by all devices.
+
+    Useful to give a device a dedicated connection pool or a different retry policy while keeping the other defaults.
+
+    Parameters
+    ----------
+    transport : {'requests', 'httpx'}, optional
+        HTTP client of the session. Defaults to ``'requests'``.
+    max_retries : int, optional
+        Maximum number of retries of a request. With ``'requests'`` connection errors and 429/5xx responses are retried with exponential backoff, with ``'httpx'`` only failed connection attempts are. Defaults to ``MAX_RETRIES``.
+    pool_maxsize : int, optional
+        Maximum number of connections kept open per host. Defaults to ``POOL_MAXSIZE``.
+
+    Returns
+    -------
+    session : requests.Session or httpx.Client
+
+    Examples
+    --------
+    >>> with Device(device_number=123456, flespi_token=flespi_token,
+    ...             session=create_session(max_retries=10)) as device:
+    ...     telemetry = device.get_telemetry()
+    """
+    # HTTP clients are imported on first use, so importing the module stays cheap.
+    if transport == 'httpx':
+        import httpx
+        limits = httpx.Limits(max_connections=pool_maxsize,
+                              max_keepalive_connections=pool_maxsize // 2)
+        return httpx.Client(transport=httpx.HTTPTransport(
+            http2=True, limits=limits, retries=max_retries))
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    # Transient failures are retried inside urllib3 with exponential backoff,
+    # honouring Retry-After of rate limited (429) responses.
+    retries = Retry(total=max_retries, backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=frozenset(['GET', 'HEAD']),
+                    respect_retry_after_header=True)
+    session.mount('https://', HTTPAdapter(
+        pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retries))
+    return session
+
+
+def _shared_session(transport='requests'):
+    """Return the process-wide session of `transport`, so all devices share one connection pool."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(transport)
+        if session is None:
+            session = _SESSIONS[transport] = create_session(transport)
+        return session
+
+
+class FlespiAPIError(Exception):
+    """Raised when flespi.io answers a request with an unsuccessful status code.
+
+    Parameters
+    ----------
+    status : int
+        HTTP status code of the response.
+    errors : list or None
+        The ``errors`` part of the response body, None if the body carries no errors.
+    """
+
+    def __init__(self, status, errors=None):
+        super().__init__(f"Unsuccessful request. Status code: {status}, Reason: {errors}")
+        self.status = status
+        self.errors = errors
+
+
+def _api_error(status, content):
+    """Build the FlespiAPIError of an unsuccessful response, parsing its body once."""
+    errors = None
+    if status in (400, 401, 403):
+        try:
+            payload = _loads(content)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            errors = payload.get('errors')
+    return FlespiAPIError(status, errors)
+
+
+def _handle_ok(response):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Success. Content-Encoding: %s",
+                     response.headers.get('Content-Encoding', 'identity'))
+    return response
+
+
+def _handle_not_modified(response):
+    logger.debug('Not modified')
+    return response
+
+
+# Handlers of the statuses a request can succeed with, any other status raises FlespiAPIError.
+_STATUS_HANDLERS = {
+    200: _handle_ok,
+    304: _handle_not_modified,
+}
+
+
+def _conditional_headers(validator):
+    """Build revalidation headers from a stored ``(etag, last_modified, content)`` triple."""
+    etag, last_modified, _ = validator
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+
+def _revalidated_content(validators, key, validator, status, content, headers):
+    """Return the body of a successful or not modified response to a conditional request.
+
+    Parameters
+    ----------
+    validators : flespi_gateway.cache.MemoryCache or None
+        Store of ``(etag, last_modified, content)`` triples updated from a
+        successful response, None if the request is not to be revalidated later.
+    key : str
+        Key of the request in `validators`.
+    validator : tuple or None
+        Triple the request was sent with, None for an unconditional request.
+    status : int
+        Either 200 or 304.
+    content : bytes
+        Body of the response.
+    headers : mapping
+        Headers of the response.
+    """
+    if status == 304:
+        if validator is None:
+            # Nothing was asked to be revalidated, so there is no body to serve.
+            raise FlespiAPIError(304)
+        return validator[2]
+    if validators is not None:
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag or last_modified:
+            validators.setex(key, float('inf'), (etag, last_modified, content))
+    return content
+
+
+def _build_headers(flespi_token):
+    return {
+        'Accept': 'application/json',
+        'Accept-Encoding': _ACCEPT_ENCODING,
+        'Authorization': f'FlespiToken {flespi_token}'
+    }
 
 
 class Device:
@@ -34,6 +316,28 @@ class Device:
         The unique identifier for the device within the Flespi platform.
     flespi_token : str
         A valid Flespi token for authentication with the Flespi API.
+    transport : {'requests', 'httpx'}, optional
+        HTTP client used to talk to the Flespi API. Defaults to ``'requests'``.
+        ``'httpx'`` multiplexes requests over a single HTTP/2 connection and
+        requires the optional ``http2`` dependencies.
+    session : requests.Session or httpx.Client, optional
+        HTTP session matching `transport` used for all requests. By default a
+        session shared by all devices of the process is used.
+    cache : flespi_gateway.cache.CacheBackend, optional
+        Cache for responses of frequently polled endpoints. Defaults to an
+        in-process :class:`~flespi_gateway.cache.MemoryCache`.
+    cache_fallback : bool, optional
+        If True (default), the last cached response of an endpoint is returned
+        when flespi.io cannot be reached.
+    timeout : tuple of float, optional
+        Connect and read timeouts in seconds. Defaults to ``DEFAULT_TIMEOUT``.
+    telemetry_ttl : float, optional
+        Seconds for which telemetry and connections are served from cache.
+        Defaults to ``CACHE_TTLS['telemetry']``; 0 disables caching of them.
+    cache_ttl : float, optional
+        Seconds for which the rarely changing device record, settings and
+        snapshots listing are served from cache. Defaults to the values in
+        ``CACHE_TTLS``; 0 disables caching of them.
 
     Attributes
     ----------
@@ -45,13 +349,21 @@ class Device:
         HTTP headers to include in requests to the Flespi API.
     base_url : str
         The base URL for the Flespi API endpoints related to devices.
+    session : requests.Session or httpx.Client
+        Persistent HTTP session. It keeps connections to flespi.io alive between
+        calls, is shared by default between all devices of the process and
+        retries transient gateway errors.
+    cache_fallback : bool
+        Whether stale cached responses are served on network errors.
+    timeout : tuple of float
+        Connect and read timeouts in seconds.
 
     Raises
     ------
     TypeError
         If `device_number` is not an integer or `flespi_token` is not a string.
     ValueError
-        If `flespi_token` is not exactly 64 characters long.
+        If `flespi_token` is not exactly 64 characters long or `transport` is unknown.
 
     Examples
     --------
@@ -61,25 +373,62 @@ class Device:
     >>> print(device.get_logs())
     {'logs': [...]}
 
+    All devices share one pool of keep-alive connections. A dedicated session
+    can be passed instead:
+
+    >>> device = Device(device_number=device_number, flespi_token=flespi_token,
+    ...                 session=create_session())
+
     Methods
     -------
+    from_trusted(device_number, flespi_token, **kwargs)
+        Create a device from already validated arguments.
     get_logs()
         Fetch and return logs for the specified device.
+    iter_logs()
+        Lazily iterate over logs for the specified device.
     get_settings(all=True)
         Retrieve settings for the device, optionally filtered by parameters.
     get_messages(params=None)
         Get messages for the device, optionally filtered by parameters.
+    iter_messages(params=None)
+        Lazily iterate over messages for the device.
+    messages_to_dataframe(params=None, columns=None)
+        Load messages of the device into a pandas DataFrame.
+    iter_packets()
+        Lazily iterate over packets for the device.
     get_telemetry()
         Fetch the latest telemetry data for the device.
     get_devices(all=False)
         Retrieve a list of devices, optionally including all devices on the account.
+    get_devices_paged(page_size=BATCH_SIZE, workers=8)
+        Retrieve all devices on the account in concurrently fetched pages.
     get_snapshots()
         List available message snapshots for the device.
-    get_snapshot(output)
-        Fetch the latest snapshot file for the device and save it to a specified file.
+    iter_snapshots()
+        Lazily iterate over snapshots listings for the device.
+    get_snapshot(output, snapshot=None)
+        Fetch a snapshot file, by default the latest one, and save it to a specified file.
+    get_telemetry_batch(device_numbers, flespi_token)
+        Retrieve telemetry of many devices with multi-device requests.
+    fetch_many(endpoints, max_workers=8)
+        Concurrently fetch several endpoints of the device.
+    invalidate_cache()
+        Drop cached responses of the device.
+    close()
+        Close the HTTP session passed to the device.
     """
 
-    def __init__(self, device_number, flespi_token):
+    # Fleets may hold thousands of devices, so instances carry no __dict__.
+    __slots__ = (
+        'device_number', 'flespi_token', 'headers', 'base_url', 'transport', 'timeout',
+        'session', 'cache_fallback', '_device_base', '_urls', '_snapshot_url', '_timeout',
+        '_transport_error', '_cache', '_ttls', '_inflight', '_inflight_lock', '_validators',
+        '_last_seen_snapshot_id', '_key_prefix',
+    )
+
+    def __init__(self, device_number, flespi_token, transport='requests', session=None, cache=None,
+                 cache_fallback=True, timeout=DEFAULT_TIMEOUT, telemetry_ttl=None, cache_ttl=None):
         """
         Constructs all the necessary attributes for the Device object.
 
@@ -89,52 +438,266 @@ class Device:
             The unique identifier for the device within the Flespi platform.
         flespi_token : str
             A valid Flespi token for authentication with the Flespi API.
+        transport : {'requests', 'httpx'}, optional
+            HTTP client used to talk to the Flespi API. Defaults to ``'requests'``.
+        session : requests.Session or httpx.Client, optional
+            HTTP session matching `transport`. Defaults to a session shared by all devices.
+        cache : flespi_gateway.cache.CacheBackend, optional
+            Cache for responses of frequently polled endpoints. Defaults to a ``MemoryCache``.
+        cache_fallback : bool, optional
+            Serve the last cached response of an endpoint on network errors. Defaults to True.
+        timeout : tuple of float, optional
+            Connect and read timeouts in seconds. Defaults to ``DEFAULT_TIMEOUT``.
+        telemetry_ttl : float, optional
+            Seconds for which telemetry and connections are cached. Defaults to ``CACHE_TTLS['telemetry']``.
+        cache_ttl : float, optional
+            Seconds for which the device record, settings and snapshots are cached. Defaults to ``CACHE_TTLS``.
 
         Raises
         ------
         TypeError
             If `device_number` is not an integer or `flespi_token` is not a string.
         ValueError
-            If `flespi_token` is not exactly 64 characters long.
+            If `flespi_token` is not exactly 64 characters long or `transport` is unknown.
         """
         if not isinstance(device_number, int):
             raise TypeError("Device number must be an integer!")
-        if not isinstance(flespi_token, str) or len(flespi_token) != 64:
-            raise ValueError("Token must be a 64-character string!")
+        if not isinstance(flespi_token, str):
+            raise TypeError("Token must be a string!")
+        if len(flespi_token) != 64:
+            raise ValueError("Token must be 64 characters long!")
+        self._setup(device_number, flespi_token, transport, session, cache,
+                    cache_fallback, timeout, telemetry_ttl, cache_ttl)
+
+    @classmethod
+    def from_trusted(cls, device_number, flespi_token, **kwargs):
+        """
+        Create a device without validating `device_number` and `flespi_token`.
 
+        Intended for trusted code paths, e.g. building many devices from a configuration that was validated as a whole, where the per-instance checks of the constructor are redundant.
+
+        Parameters
+        ----------
+        device_number : int
+            The unique identifier for the device within the Flespi platform.
+        flespi_token : str
+            A valid 64-character Flespi token.
+        **kwargs
+            Any other keyword argument accepted by :class:`Device`.
+
+        Returns
+        -------
+        device : Device
+            A device equivalent to ``Device(device_number, flespi_token, **kwargs)``.
+
+        Examples
+        --------
+        >>> devices = [Device.from_trusted(number, flespi_token) for number in config['devices']]
+        """
+        device = cls.__new__(cls)
+        device._setup(device_number, flespi_token, **kwargs)
+        return device
+
+    def _setup(self, device_number, flespi_token, transport='requests', session=None, cache=None,
+               cache_fallback=True, timeout=DEFAULT_TIMEOUT, telemetry_ttl=None, cache_ttl=None):
         self.device_number = device_number
         self.flespi_token = flespi_token
-        self.headers = {
-            'Accept': 'application/json',
-            'Authorization': f'FlespiToken {self.flespi_token}'
-        }
-        self.base_url = "https://flespi.io/gw/devices/"
+        self.headers = _build_headers(self.flespi_token)
+        self.base_url = BASE_URL
+        self._device_base = f"{self.base_url}{self.device_number}/"
+        self._urls = {name: self._device_base + path for name, path in _ENDPOINTS.items()}
+        self._urls.update({'self': self._device_base[:-1], 'all': f"{self.base_url}all"})
+        self._snapshot_url = self._device_base + 'snapshots/{}'
+
+        self.transport = transport
+        self.timeout = timeout
+        if transport == 'requests':
+            import requests
+            self._timeout = timeout
+            self._transport_error = requests.exceptions.RequestException
+        elif transport == 'httpx':
+            import httpx
+            self._timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+            self._transport_error = httpx.HTTPError
+        else:
+            raise ValueError("Transport must be either 'requests' or 'httpx'!")
+        self.session = session if session is not None else _shared_session(transport)
+
+        self.cache_fallback = cache_fallback
+        self._cache = cache if cache is not None else MemoryCache(maxsize=128)
+        self._ttls = dict(CACHE_TTLS)
+        if telemetry_ttl is not None:
+            self._ttls.update(telemetry=telemetry_ttl, connections=telemetry_ttl)
+        if cache_ttl is not None:
+            self._ttls.update(devices=cache_ttl, settings=cache_ttl, snapshots=cache_ttl)
+        # Cached responses are shared only between devices of the same number and
+        # token, which is never written to the cache itself.
+        token_hash = hashlib.sha256(flespi_token.encode()).hexdigest()[:16]
+        self._key_prefix = f"{token_hash}:{device_number}:"
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Last ETag, Last-Modified and body per cached request, used for conditional requests.
+        self._validators = MemoryCache(maxsize=128)
+        self._last_seen_snapshot_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the HTTP session passed to the device and release its pooled connections.
+
+        The session shared by default between all devices is left open.
+        """
+        if self.session is not _SESSIONS.get(self.transport):
+            self.session.close()
+
+    def invalidate_cache(self):
+        """Drop all responses this device stored in its cache, so the next calls reach flespi.io.
+
+        Examples
+        --------
+        >>> settings = device.get_settings()
+        >>> # ... settings are changed in flespi.io ...
+        >>> device.invalidate_cache()
+        >>> settings = device.get_settings()
+        """
+        self._cache.delete_prefix(self._key_prefix)
+        self._validators.clear()
 
     def _build_url(self, endpoint):
-        return f"{self.base_url}{self.device_number}/{endpoint}"
+        return self._device_base + endpoint
 
-    def _perform_get_request(self, link, params=None):
-        """Perform a GET request to the specified link with optional parameters."""
+    def _perform_get_request(self, link, params=None, headers=None):
+        """Perform a GET request to the specified link with optional parameters and extra headers."""
+        headers = {**self.headers, **headers} if headers else self.headers
         try:
-            response = requests.get(link, params=params, headers=self.headers)
+            response = self.session.get(
+                link, params=params, headers=headers, timeout=self._timeout)
             return self._process_response(response)
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Request failed: {e}")
+        except self._transport_error as e:
+            # Callers decide whether the error is recovered from or reported.
+            logger.debug("Request to %s failed: %s", link, e)
             raise
 
+    @contextlib.contextmanager
+    def _stream(self, link, params=None):
+        """Yield the response of a successful streamed GET request."""
+        try:
+            if self.transport == 'httpx':
+                with self.session.stream('GET', link, params=params, headers=self.headers,
+                                         timeout=self._timeout) as response:
+                    if response.status_code != 200:
+                        response.read()
+                    yield self._process_response(response)
+                return
+            response = self.session.get(
+                link, params=params, headers=self.headers, stream=True, timeout=self._timeout)
+        except self._transport_error as e:
+            logger.debug("Request to %s failed: %s", link, e)
+            raise
+        with response:
+            yield self._process_response(response)
+
+    def _iter_chunks(self, response):
+        if self.transport == 'httpx':
+            return response.iter_bytes(STREAM_CHUNK_SIZE)
+        return response.iter_content(STREAM_CHUNK_SIZE)
+
+    def _iter_items(self, link, params=None, prefix='result.item'):
+        """Lazily yield JSON items found under `prefix` while the response is being received."""
+        if ijson is None:
+            raise ImportError(
+                "Streaming requires ijson: python3 -m pip install flespi-gateway[stream]")
+        with self._stream(link, params=params) as response:
+            items = ijson.sendable_list()
+            parser = _ijson_backend.items_coro(items, prefix, use_float=True)
+            for chunk in self._iter_chunks(response):
+                parser.send(chunk)
+                yield from items
+                del items[:]
+            parser.close()
+            yield from items
+
+    def _get_endpoint(self, name, params=None):
+        """Return the decoded response of a fixed endpoint, cached according to its TTL."""
+        return self._get_json(self._urls[name], params=params, ttl=self._ttls.get(name))
+
+    def _get_path(self, path):
+        name = _ENDPOINT_NAMES.get(path)
+        if name is not None:
+            # Logs and packets are sent the same default time window as get_logs and get_packets.
+            params = DEFAULT_TIME_WINDOW_PARAMS if name in ('logs', 'packets') else None
+            return self._get_endpoint(name, params=_encode_params(params))
+        return self._get_json(self._build_url(path))
+
+    def _cache_key(self, link, params=None):
+        key = self._key_prefix + link
+        return f"{key}?{urlencode(sorted(dict(params).items()))}" if params else key
+
+    def _get_json(self, link, params=None, ttl=None):
+        """Return the decoded JSON body of a GET request, serving it from cache while fresh."""
+        key = self._cache_key(link, params)
+        if not ttl:
+            return self._fetch_json(link, params, key)
+        content = self._cache.get(key)
+        if content is not None:
+            return _loads(content)
+
+        # Concurrent misses on the same key wait for a single upstream request.
+        with self._inflight_lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+        if not leader:
+            event.wait()
+            # Served from the cache if the leader succeeded, otherwise a new leader is elected.
+            return self._get_json(link, params, ttl)
+        try:
+            return self._fetch_json(link, params, key, ttl)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            event.set()
+
+    def _fetch_json(self, link, params, key, ttl=None):
+        # Only cached endpoints are revalidated, so bodies of filtered requests such
+        # as messages are not kept around.
+        validators = self._validators if ttl else None
+        validator = validators.get_stale(key) if validators is not None else None
+        headers = _conditional_headers(validator) if validator else None
+        try:
+            response = self._perform_get_request(link, params=params, headers=headers)
+        except self._transport_error:
+            content = self._cache.get_stale(key) if self.cache_fallback else None
+            if content is None:
+                raise
+            logger.warning("Serving cached response for %s", link)
+            return _loads(content)
+        content = _revalidated_content(validators, key, validator, response.status_code,
+                                       response.content, response.headers)
+        if ttl:
+            self._cache.setex(key, ttl, content)
+        return _loads(content)
+
     def _process_response(self, response):
-        """Process the HTTP response, logging errors and returning data as needed."""
-        if response.status_code == 200:
-            logging.info('Success')
-            return response
-        elif response.status_code in [400, 401, 403]:
-            error_info = response.json().get('errors', 'Unknown error')
-            logging.error(
-                f"Unsuccessful request. Status code: {response.status_code}, Reason: {error_info}")
-        else:
-            logging.error(
-                f"Unexpected status code received: {response.status_code}")
-        return None
+        """Return a successful or not modified response, raise FlespiAPIError otherwise."""
+        handler = _STATUS_HANDLERS.get(response.status_code)
+        if handler is None:
+            raise _api_error(response.status_code, response.content)
+        return handler(response)
+
+    @staticmethod
+    def _get_or_none(fetch, link):
+        """Return ``fetch(link)``, None if flespi.io rejected the request."""
+        try:
+            return fetch(link)
+        except FlespiAPIError as e:
+            logger.error("Request to %s failed: %s", link, e)
+            return None
 
     def _put_handler(self, link):
         pass
@@ -153,8 +716,13 @@ class Device:
 
         Returns
         -------
-        devices : dict or None
-            A dictionary containing the devices available to the user. The structure of the dictionary includes device identifiers and possibly other metadata about each device. Returns None if an error occurred during the request.
+        devices : dict
+            A dictionary containing the devices available to the user. The structure of the dictionary includes device identifiers and possibly other metadata about each device.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -170,9 +738,60 @@ class Device:
         Notes
         -----
         The actual structure and content of the returned devices dictionary may vary depending on the data available on the Flespi platform for the user's account. It's important to check the Flespi API documentation for the most current response format.
+
+        Responses are cached for ``CACHE_TTLS['devices']`` seconds, see the `cache_ttl` argument of :class:`Device` and :meth:`invalidate_cache`.
         """
-        link = "https://flespi.io/gw/devices/all" if all else f"https://flespi.io/gw/devices/{self.device_number}"
-        return self._perform_get_request(link).json()
+        link = self._urls['all'] if all else self._urls['self']
+        return self._get_json(link, ttl=self._ttls['devices'])
+
+    def get_devices_paged(self, page_size=BATCH_SIZE, workers=8):
+        """
+        Retrieve all devices of the account, fetching them in concurrent pages.
+
+        A first lightweight request lists only the identifiers of all devices. Full
+        device records are then requested in pages of `page_size` devices using the
+        comma-separated `dev-selector`, with up to `workers` pages in flight at once
+        over the pooled session, so the total time approaches the duration of the
+        slowest page rather than the sum of all of them.
+
+        Parameters
+        ----------
+        page_size : int, optional
+            Number of devices requested per page. Defaults to ``BATCH_SIZE``, which keeps URLs reasonably short.
+        workers : int, optional
+            Maximum number of pages fetched concurrently. Defaults to 8.
+
+        Returns
+        -------
+        devices : dict
+            A dictionary of the same structure as returned by ``get_devices(all=True)``. Pages rejected by flespi.io are omitted.
+
+        Raises
+        ------
+        FlespiAPIError
+            If the devices could not be listed.
+
+        Examples
+        --------
+        >>> devices = device.get_devices_paged(page_size=100, workers=4)
+        >>> print(len(devices['result']))
+        1250
+
+        See Also
+        --------
+        get_devices : For retrieving all devices with a single request.
+        """
+        listing = self._get_json(self._urls['all'], params={'fields': 'id'})
+        ids = [row['id'] for row in listing['result']]
+        links = [
+            self.base_url + ','.join(map(str, ids[start:start + page_size]))
+            for start in range(0, len(ids), page_size)
+        ]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._get_or_none, self._get_json, link) for link in links]
+            pages = [future.result() for future in futures]
+        return {'result': list(chain.from_iterable(
+            page['result'] for page in pages if page is not None))}
 
     # History and State
     def get_messages(self, params=None):
@@ -186,12 +805,17 @@ class Device:
         Parameters
         ----------
         params : dict, optional
-            A dictionary containing parameters to filter and customize the message retrieval. Supports a wide range of filtering options, including time ranges, message types, and the 'generalize' parameter for data aggregation and simplification. If None (default), all stored messages for the device are retrieved.
+            A dictionary containing parameters to filter and customize the message retrieval. Supports a wide range of filtering options, including time ranges, message types, and the 'generalize' parameter for data aggregation and simplification. The parameters are JSON-encoded into the ``data`` query parameter. If None (default), all stored messages for the device are retrieved.
 
         Returns
         -------
-        messages : dict or None
-            A dictionary containing the retrieved messages, sorted by timestamp. If messages are requested from multiple devices simultaneously, the output will not have a specific sort order. Returns None if an error occurred during the request.
+        messages : dict
+            A dictionary containing the retrieved messages, sorted by timestamp. If messages are requested from multiple devices simultaneously, the output will not have a specific sort order.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -210,9 +834,79 @@ class Device:
         --------
         get_settings : For retrieving the current configuration of the device, including 'messages_ttl' and 'messages_rotate' fields.
         """
-        link = self._build_url('messages')
-        messages = self._perform_get_request(link=link)
-        return messages.json()
+        return self._get_endpoint('messages', params=_encode_params(params))
+
+    def iter_messages(self, params=None):
+        """
+        Lazily iterate over messages accumulated in the device storage.
+
+        The response is parsed while it is being received and messages are yielded one by one, so even large time windows can be processed without materializing the whole message list. Requires the optional ``ijson`` dependency.
+
+        Parameters
+        ----------
+        params : dict, optional
+            Request parameters, the same as for :meth:`get_messages`.
+
+        Yields
+        ------
+        message : dict
+            A single device message.
+
+        Examples
+        --------
+        >>> for message in device.iter_messages():
+        ...     print(message['timestamp'])
+        """
+        return self._iter_items(self._urls['messages'], params=_encode_params(params))
+
+    def messages_to_dataframe(self, params=None, columns=None):
+        """
+        Load messages accumulated in the device storage into a pandas DataFrame.
+
+        Messages are streamed with :meth:`iter_messages` and their values are appended to per-column lists as they arrive, so the decoded message list is never held in memory as a whole. Requires the optional ``ijson`` and ``pandas`` dependencies.
+
+        Parameters
+        ----------
+        params : dict, optional
+            Request parameters, the same as for :meth:`get_messages`.
+        columns : list of str, optional
+            Message fields to keep, e.g. ``['timestamp', 'position.latitude', 'position.longitude']``. Values of other fields are dropped as soon as each message is parsed. If None (default), all fields found in the messages are kept, in the order they first appear.
+
+        Returns
+        -------
+        messages : pandas.DataFrame
+            One row per message and one column per field. Fields missing in a message are None or NaN.
+
+        Examples
+        --------
+        >>> df = device.messages_to_dataframe(columns=['timestamp', 'position.speed'])
+        >>> df['time'] = convert_unix_ts_bulk(df['timestamp'])
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                "messages_to_dataframe requires pandas: python3 -m pip install flespi-gateway[pandas]") from None
+        messages = self.iter_messages(params)
+        if columns is None:
+            # Columns are added as fields first appear, padded for the messages before.
+            data, count = {}, 0
+            for message in messages:
+                for column, value in message.items():
+                    values = data.get(column)
+                    if values is None:
+                        values = data[column] = [None] * count
+                    values.append(value)
+                count += 1
+                for values in data.values():
+                    if len(values) < count:
+                        values.append(None)
+            return pd.DataFrame(data)
+        data = {column: [] for column in columns}
+        for message in messages:
+            for column, values in data.items():
+                values.append(message.get(column))
+        return pd.DataFrame(data, columns=columns)
 
     def get_telemetry(self):
         """
@@ -226,8 +920,13 @@ class Device:
 
         Returns
         -------
-        telemetry : dict or None
-            A dictionary containing the latest telemetry data for the specified device, including the timestamp and value for each telemetry field. Returns None if an error occurred during the request.
+        telemetry : dict
+            A dictionary containing the latest telemetry data for the specified device, including the timestamp and value for each telemetry field.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -242,13 +941,13 @@ class Device:
         - The actual structure and content of the returned telemetry dictionary may vary depending on the data available on the Flespi platform for the user's account.
         - Telemetry data is useful for monitoring the current state and performance of the device without needing to retrieve and process the entire message history.
         - Since telemetry data is updated with every received message, it provides a near real-time overview of the device's status.
+        - Responses are cached for `telemetry_ttl` seconds (2 by default), so rapid re-polls do not reach the Flespi platform.
 
         See Also
         --------
         get_messages : For retrieving the historical messages that contribute to the telemetry data.
         """
-        link = self._build_url('telemetry/all')
-        return self._perform_get_request(link).json()
+        return self._get_endpoint('telemetry')
 
     # Connections
     def get_connections(self):
@@ -263,8 +962,13 @@ class Device:
 
         Returns
         -------
-        connections : dict or None
-            A dictionary containing details of all active TCP connections for the specified device, including timestamps, connection status, and other relevant information. Returns None if an error occurred during the request or if there are no active connections.
+        connections : dict
+            A dictionary containing details of all active TCP connections for the specified device, including timestamps, connection status, and other relevant information.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -278,16 +982,16 @@ class Device:
         -----
         - The actual structure and content of the returned connections dictionary may vary depending on the data available on the Flespi platform for the user's account.
         - Active connections are those that are currently open and transmitting data. Closed connections may also be listed if they were active recently.
+        - Responses are cached for `telemetry_ttl` seconds (2 by default), like telemetry.
 
         See Also
         --------
         get_messages : For retrieving messages that may have been transmitted during these connections.
         """
-        link = self._build_url('connections/all')
-        return self._perform_get_request(link).json()
+        return self._get_endpoint('connections')
 
     # Utils
-    def get_logs(self, params={'data': '{"from":1702303046,"to":1702317898}'}):
+    def get_logs(self, params=None):
         """
         Fetch and return logs for the specified device.
 
@@ -295,12 +999,18 @@ class Device:
 
         Parameters
         ----------
-        None
+        params : dict, optional
+            Request parameters such as ``{'from': 1702303046, 'to': 1702317898}``, JSON-encoded into the ``data`` query parameter, or an already encoded ``{'data': ...}``. Defaults to ``DEFAULT_TIME_WINDOW_PARAMS``.
 
         Returns
         -------
-        logs : dict or None
-            A dictionary containing the logs for the specified device, sorted by timestamp. Each log entry includes details such as the log level, message, and timestamp. Returns None if an error occurred during the request or if there are no logs available.
+        logs : dict
+            A dictionary containing the logs for the specified device, sorted by timestamp. Each log entry includes details such as the log level, message, and timestamp.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -314,15 +1024,44 @@ class Device:
         -----
         - The structure and content of the returned logs dictionary may vary depending on the data available on the Flespi platform for the user's account.
         - Logs are an essential tool for diagnosing issues and understanding the behavior of the device over time.
+        - Responses are cached in memory for ``CACHE_TTLS['logs']`` seconds per set of parameters.
 
         See Also
         --------
         get_messages : For retrieving messages that may have been logged as part of the device's operation.
         """
-        link = self._build_url('logs')
-        return self._perform_get_request(link=link, params=params).json()
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return self._get_endpoint('logs', params=_encode_params(params))
+
+    def iter_logs(self, params=None):
+        """
+        Lazily iterate over logs of the specified device.
+
+        Unlike :meth:`get_logs`, the response is parsed while it is being received
+        and log entries are yielded one by one, so memory usage does not grow with
+        the number of logs. Requires the optional ``ijson`` dependency.
+
+        Parameters
+        ----------
+        params : dict, optional
+            Request parameters, the same as for :meth:`get_logs`. Defaults to ``DEFAULT_TIME_WINDOW_PARAMS``.
+
+        Yields
+        ------
+        log : dict
+            A single log entry.
+
+        Examples
+        --------
+        >>> for log in device.iter_logs():
+        ...     print(log['timestamp'])
+        """
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return self._iter_items(self._urls['logs'], params=_encode_params(params))
 
-    def get_packets(self, params={'data': '{"from":1702303046,"to":1702317898}'}):
+    def get_packets(self, params=None):
         """
         Fetch and return packets for the specified device.
 
@@ -330,12 +1069,18 @@ class Device:
 
         Parameters
         ----------
-        None
+        params : dict, optional
+            Request parameters such as ``{'from': 1702303046, 'to': 1702317898}``, JSON-encoded into the ``data`` query parameter, or an already encoded ``{'data': ...}``. Defaults to ``DEFAULT_TIME_WINDOW_PARAMS``.
 
         Returns
         -------
-        packets : dict or None
-            A dictionary containing the packets for the specified device, sorted by timestamp. Each packet entry includes details such as the packet level, message, and timestamp. Returns None if an error occurred during the request or if there are no packets available.
+        packets : dict
+            A dictionary containing the packets for the specified device, sorted by timestamp. Each packet entry includes details such as the packet level, message, and timestamp.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -354,8 +1099,29 @@ class Device:
         --------
         get_messages : For retrieving messages that may have been logged as part of the device's operation.
         """
-        link = self._build_url('packets')
-        return self._perform_get_request(link=link, params=params).json()
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return self._get_endpoint('packets', params=_encode_params(params))
+
+    def iter_packets(self, params=None):
+        """
+        Lazily iterate over packets of the specified device.
+
+        The response is parsed while it is being received, see :meth:`iter_logs`.
+
+        Parameters
+        ----------
+        params : dict, optional
+            Request parameters, the same as for :meth:`get_packets`. Defaults to ``DEFAULT_TIME_WINDOW_PARAMS``.
+
+        Yields
+        ------
+        packet : dict
+            A single packet entry.
+        """
+        if params is None:
+            params = DEFAULT_TIME_WINDOW_PARAMS
+        return self._iter_items(self._urls['packets'], params=_encode_params(params))
 
     def get_snapshots(self):
         """
@@ -386,35 +1152,42 @@ class Device:
         - Snapshots are intended for diagnostic purposes only, such as restoring device messages in case of accidental changes or deletion. They should not be relied upon in production environments.
         - The availability of snapshots and their periodic generation are not guaranteed, as this is part of internal functionality provided outside of the standard Flespi platform services.
         - For regular device messages retrieval, always use the GET /gw/devices/{dev-selector}/messages API call instead of snapshots.
+        - Responses are cached in memory for ``CACHE_TTLS['snapshots']`` seconds.
 
         See Also
         --------
         get_snapshot : For downloading a specific snapshot identified by its timestamp.
         get_messages : For retrieving messages from the device, which is the recommended method for regular message access.
         """
-        link = self._build_url('snapshots')
         try:
-            return self._perform_get_request(link).json()
-        except requests.exceptions.HTTPError as http_err:
-            # Specific HTTP error
-            logging.error(f'HTTP error occurred: {http_err}')
-        except requests.exceptions.ConnectionError as conn_err:
-            # Network problem
-            logging.error(f'Connection error occurred: {conn_err}')
-        except requests.exceptions.Timeout as timeout_err:
-            # Request timeout
-            logging.error(f'Request timed out: {timeout_err}')
-        except requests.exceptions.RequestException as req_err:
-            # Catch-all for requests exceptions
-            logging.error(f'Error during request to {link}: {req_err}')
-        except Exception as e:
-            # Non-requests exceptions
-            logging.error(f'An unexpected error occurred: {e}')
-        return None
+            return self._fetch_snapshots()
+        except (self._transport_error, FlespiAPIError) as e:
+            logger.error("Failed to fetch snapshots of device %s: %s", self.device_number, e)
+            return None
+
+    def _fetch_snapshots(self):
+        """Return the snapshots listing, letting request errors propagate."""
+        snapshots_info = self._get_endpoint('snapshots')
+        # Remembered so that the next download can start before the listing arrives.
+        self._last_seen_snapshot_id = self._latest_snapshot_id(snapshots_info)
+        return snapshots_info
+
+    def iter_snapshots(self):
+        """
+        Lazily iterate over snapshots listings of the specified device.
 
-    def get_snapshot(self, output):
+        The response is parsed while it is being received, see :meth:`iter_logs`.
+
+        Yields
+        ------
+        snapshots : dict
+            Snapshots listing of a device, e.g. ``{'id': 123456, 'snapshots': [1610000000, ...]}``.
         """
-        Download the latest snapshot file available for device messages and saves it to a file.
+        return self._iter_items(self._urls['snapshots'])
+
+    def get_snapshot(self, output, snapshot=None):
+        """
+        Download a snapshot file of device messages, by default the latest one, and save it to a file.
 
         This method fetches the most recent snapshot archive for the specified device, identified by a 'dev-selector', and saves it to the specified output file. Snapshots are generated approximately once per day for all device messages and are stored in the archive for a limited time. The 'snapshot-selector' is used to specify the UNIX timestamp of the snapshot to be downloaded, which can be listed using the GET /gw/devices/{dev-selector}/snapshots API call.
 
@@ -422,6 +1195,8 @@ class Device:
         ----------
         output : str
             The file path where the downloaded snapshot will be saved.
+        snapshot : int, optional
+            UNIX timestamp of the snapshot to download, as listed by :meth:`get_snapshots`. If None (default), the latest available snapshot is downloaded.
 
         Returns
         -------
@@ -432,40 +1207,91 @@ class Device:
         >>> device.get_snapshot(output='device_snapshot.zip')
         Snapshot downloaded and saved to 'device_snapshot.zip'.
 
+        >>> device.get_snapshot(output='device_snapshot.zip', snapshot=1610000000)
+
         Notes
         -----
         - The 'dev-selector' specifies the device for which to download the snapshot, usually by ID, configuration.ident, name, and other criteria.
         - Snapshots are intended for diagnostic purposes only, such as restoring device messages in case of accidental changes or deletion. They should not be relied upon in production environments.
         - The availability of snapshots and their periodic generation are not guaranteed, as this is part of internal functionality provided outside of the standard Flespi platform services.
         - For regular device messages retrieval, always use the GET /gw/devices/{dev-selector}/messages API call instead of snapshots.
+        - The file is written in blocks of ``SNAPSHOT_CHUNK_SIZE`` bytes while it is being downloaded, so memory usage does not depend on the snapshot size.
+        - The snapshots listing is served from cache when it was fetched recently, see :meth:`get_snapshots`.
+        - Once a snapshot has been listed, the download of the latest known snapshot starts concurrently with the listing request and is only kept if the listing confirms it is still the latest one.
 
         See Also
         --------
         get_messages : For retrieving messages from the device, which is the recommended method for regular message access.
         """
-        snapshots_info = self.get_snapshots()
-        if snapshots_info is None or 'result' not in snapshots_info or not snapshots_info['result']:
-            logging.error(
-                "No snapshots available or failed to retrieve snapshots.")
+        if snapshot is not None:
+            self._download_snapshot(snapshot, output)
             return
 
-        # Assuming the structure is {'result': [{'id': device_id, 'snapshots': [snapshot_ids]}]}
-        # and you want the latest snapshot from the first device in the list
-        latest_snapshot_id = max(snapshots_info['result'][0]['snapshots'])
-
-        # Construct the link for the latest snapshot
-        # link = f'https://flespi.io/gw/devices/{self.device_number}/snapshots/{latest_snapshot_id}'
-        link = self._build_url(endpoint=f'snapshots/{latest_snapshot_id}')
+        snapshots_info = None
+        predicted_id = self._last_seen_snapshot_id
+        if predicted_id is not None:
+            try:
+                snapshots_info = self._save_predicted_snapshot(predicted_id, output)
+            except (self._transport_error, FlespiAPIError, OSError) as e:
+                logger.debug("Speculative download of snapshot %s failed: %s", predicted_id, e)
+            else:
+                if self._latest_snapshot_id(snapshots_info) == predicted_id:
+                    logger.info("Snapshot data saved to %s.", output)
+                    return
+
+        if snapshots_info is None:
+            try:
+                snapshots_info = self._fetch_snapshots()
+            except (self._transport_error, FlespiAPIError) as e:
+                logger.error("Failed to retrieve snapshots: %s", e)
+                return
+        latest_snapshot_id = self._latest_snapshot_id(snapshots_info)
+        if latest_snapshot_id is None:
+            logger.error("No snapshots available for the device.")
+            return
+        self._download_snapshot(latest_snapshot_id, output)
 
+    def _download_snapshot(self, snapshot_id, output):
         try:
-            snapshot_data = self._perform_get_request(link)
-            if snapshot_data.status_code == 200:
-                with open(output, 'wb') as f:
-                    for chunk in snapshot_data.iter_content(chunk_size=128):
-                        f.write(chunk)
-                logging.info(f"Snapshot data saved to {output}.")
-        except Exception as e:
-            logging.error(f"Failed to fetch or save snapshot data: {e}")
+            with self._stream(self._snapshot_url.format(snapshot_id)) as snapshot_data:
+                self._save_snapshot(snapshot_data, output)
+            logger.info("Snapshot data saved to %s.", output)
+        except (self._transport_error, FlespiAPIError, OSError) as e:
+            logger.error("Failed to fetch or save snapshot data: %s", e)
+
+    def _save_predicted_snapshot(self, snapshot_id, output):
+        """Download `snapshot_id` while the listing confirming it is still the latest is fetched.
+
+        Returns the snapshots listing. `output` is left untouched when a newer snapshot is listed.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            listing = executor.submit(self._fetch_snapshots)
+            with self._stream(self._snapshot_url.format(snapshot_id)) as snapshot_data:
+                snapshots_info = listing.result()
+                if self._latest_snapshot_id(snapshots_info) == snapshot_id:
+                    self._save_snapshot(snapshot_data, output)
+        return snapshots_info
+
+    def _save_snapshot(self, snapshot_data, output):
+        with open(output, 'wb') as f:
+            if self.transport == 'httpx':
+                for chunk in snapshot_data.iter_bytes(SNAPSHOT_CHUNK_SIZE):
+                    f.write(chunk)
+            else:
+                # Copy the decoded urllib3 stream in large blocks at C speed.
+                snapshot_data.raw.decode_content = True
+                shutil.copyfileobj(snapshot_data.raw, f, length=SNAPSHOT_CHUNK_SIZE)
+
+    @staticmethod
+    def _latest_snapshot_id(snapshots_info):
+        # The structure is {'result': [{'id': device_id, 'snapshots': [snapshot_ids]}]},
+        # take the latest snapshot of the first device in the list.
+        if not snapshots_info or not snapshots_info.get('result'):
+            return None
+        return max(
+            (snapshot for snapshot in snapshots_info['result'][0].get('snapshots', ())
+             if isinstance(snapshot, int)),
+            default=None)
 
     # Remote control: settings
     def get_settings(self, all=True):
@@ -481,8 +1307,13 @@ class Device:
 
         Returns
         -------
-        settings : dict or None
-            A dictionary containing the requested device settings, their schemes, and current values. Each setting is represented as a key-value pair within the dictionary, where the key is the setting name and the value is its current value. Returns None if an error occurred during the request.
+        settings : dict
+            A dictionary containing the requested device settings, their schemes, and current values. Each setting is represented as a key-value pair within the dictionary, where the key is the setting name and the value is its current value.
+
+        Raises
+        ------
+        FlespiAPIError
+            If flespi.io responds with an unsuccessful status code.
 
         Examples
         --------
@@ -499,17 +1330,141 @@ class Device:
         - The 'dev-selector' and 'sett-selector' functionalities are implied by the method's parameters and usage context. The actual implementation of these selectors depends on the method's internal logic and the API's capabilities.
         - Device settings are essentially cached shadows of device configuration options stored within Flespi. The 'current' property of each setting reflects its latest known value.
         - The structure and content of the returned settings dictionary may vary depending on the data available on the Flespi platform for the user's account and the specified selectors.
+        - Responses are cached for ``CACHE_TTLS['settings']`` seconds, see the `cache_ttl` argument of :class:`Device` and :meth:`invalidate_cache`.
 
         See Also
         --------
         get_messages : For retrieving messages that may have been affected by the device settings.
         """
         if all:
-            link = self._build_url(endpoint='settings/all')
-            # link = f'https://flespi.io/gw/devices/{self.device_number}/settings/all'
-            return self._perform_get_request(link).json()
+            return self._get_endpoint('settings')
         else:
             # If there's a future implementation planned for when `all` is False, handle it here.
             # For now, raise an error to indicate the method is not yet implemented for this case.
             raise NotImplementedError(
                 "Retrieval of filtered settings is not implemented.")
+
+    # Batch
+    @classmethod
+    def get_telemetry_batch(cls, device_numbers, flespi_token):
+        """
+        Retrieve telemetry of many devices with as few HTTP requests as possible.
+
+        Equivalent to the module-level :func:`get_telemetry_batch`, provided for code that only imports :class:`Device`.
+
+        Examples
+        --------
+        >>> telemetry = Device.get_telemetry_batch([123456, 654321], flespi_token=flespi_token)
+        """
+        return get_telemetry_batch(device_numbers, flespi_token)
+
+    def fetch_many(self, endpoints, max_workers=8):
+        """
+        Concurrently fetch several endpoints of the device.
+
+        All requests are dispatched at once over the pooled session, so the total time is close to the slowest single request instead of the sum of all of them. Endpoints with a cache TTL, such as 'telemetry/all' or 'logs', are served from and stored to the cache as usual. Like :meth:`get_logs` and :meth:`get_packets`, 'logs' and 'packets' are requested for ``DEFAULT_TIME_WINDOW_PARAMS``.
+
+        Parameters
+        ----------
+        endpoints : list of str
+            Endpoint paths relative to the device, e.g. ``['telemetry/all', 'connections/all', 'settings/all']``.
+        max_workers : int, optional
+            Maximum number of simultaneous requests. Defaults to 8.
+
+        Returns
+        -------
+        results : dict
+            Decoded responses keyed by endpoint path. A value is None if flespi.io rejected its request.
+
+        Examples
+        --------
+        >>> results = device.fetch_many(['telemetry/all', 'connections/all', 'messages'])
+        >>> print(results['telemetry/all'])
+        {'result': [{'id': 123456, 'telemetry': {...}}]}
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {endpoint: executor.submit(self._get_or_none, self._get_path, endpoint)
+                       for endpoint in endpoints}
+            return {endpoint: future.result() for endpoint, future in futures.items()}
+
+
+def batch_get(endpoint, device_numbers, flespi_token, params=None):
+    """
+    Retrieve an endpoint of many devices with as few HTTP requests as possible.
+
+    Devices are addressed with the comma-separated `dev-selector` of the Flespi API,
+    so up to ``BATCH_SIZE`` devices are fetched with a single request over the
+    keep-alive connections shared with :class:`Device`.
+
+    Parameters
+    ----------
+    endpoint : str
+        Endpoint path relative to the devices, e.g. ``'telemetry/all'`` or ``'settings/all'``.
+    device_numbers : iterable of int
+        Unique identifiers of the devices within the Flespi platform.
+    flespi_token : str
+        A valid Flespi token for authentication with the Flespi API.
+    params : dict, optional
+        Request parameters sent with every request, encoded like those of :class:`Device` methods.
+
+    Returns
+    -------
+    rows : dict
+        Entries of the ``result`` part of the responses keyed by their ``id``. Devices from failed or unsuccessful requests are omitted.
+
+    Examples
+    --------
+    >>> connections = batch_get('connections/all', [123456, 654321], flespi_token=flespi_token)
+    >>> print(connections[123456])
+    {'id': 123456, ...}
+    """
+    import requests
+    device_numbers = list(device_numbers)
+    rows = {}
+    session = _shared_session()
+    headers = _build_headers(flespi_token)
+    params = _encode_params(params)
+    for start in range(0, len(device_numbers), BATCH_SIZE):
+        selector = ','.join(map(str, device_numbers[start:start + BATCH_SIZE]))
+        link = f"{BASE_URL}{selector}/{endpoint}"
+        try:
+            response = session.get(link, params=params, headers=headers, timeout=DEFAULT_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to %s failed: %s", link, e)
+            continue
+        if response.status_code != 200:
+            logger.error("Request to %s failed: %s", link,
+                         _api_error(response.status_code, response.content))
+            continue
+        for row in _loads(response.content)['result']:
+            rows[row['id']] = row
+    return rows
+
+
+def get_telemetry_batch(device_numbers, flespi_token):
+    """
+    Retrieve telemetry of many devices with as few HTTP requests as possible.
+
+    Parameters
+    ----------
+    device_numbers : iterable of int
+        Unique identifiers of the devices within the Flespi platform.
+    flespi_token : str
+        A valid Flespi token for authentication with the Flespi API.
+
+    Returns
+    -------
+    telemetry : dict
+        Telemetry entries keyed by device number. Devices from unsuccessful requests are omitted.
+
+    Examples
+    --------
+    >>> telemetry = get_telemetry_batch([123456, 654321], flespi_token=flespi_token)
+    >>> print(telemetry[123456])
+    {'id': 123456, 'telemetry': {'battery.voltage': {'ts': 1609521935, 'value': 4.049}, ...}}
+
+    See Also
+    --------
+    batch_get : For fetching other endpoints of many devices.
+    """
+    return batch_get(_ENDPOINTS['telemetry'], device_numbers, flespi_token)
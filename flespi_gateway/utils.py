@@ -3,10 +3,34 @@
 
 
 from datetime import datetime
-import pytz
+from functools import lru_cache
+
+try:
+    from zoneinfo import ZoneInfo as _timezone
+except ImportError:
+    from pytz import timezone as _timezone
 
 #logging.info('Admin logged in')
 
+
+@lru_cache(maxsize=64)
+def _tz(name):
+    return _timezone(name)
+
+
+def _localize(date_time_obj, tz):
+    # pytz zones must attach their offset through localize() to avoid LMT offsets.
+    if hasattr(tz, 'localize'):
+        return tz.localize(date_time_obj)
+    # Like pytz localize(), ambiguous and nonexistent times take the standard time offset.
+    date_time_obj = date_time_obj.replace(tzinfo=tz)
+    if date_time_obj.dst():
+        other = date_time_obj.replace(fold=1)
+        if not other.dst():
+            return other
+    return date_time_obj
+
+
 def convert_unix_ts(timestamp, timezone="Europe/Berlin"):
     """Utility function to help converting flespi utc unix time output to human readable.
 
@@ -24,12 +48,45 @@ def convert_unix_ts(timestamp, timezone="Europe/Berlin"):
         Human readable time with a following format: %Y-%m-%d %H:%M:%S
     """
 
-    timezone = pytz.timezone(timezone)
-    date = datetime.fromtimestamp(timestamp, timezone)
+    date = datetime.fromtimestamp(timestamp, _tz(timezone))
 
     return date.strftime('%Y-%m-%d %H:%M:%S')
 
 
+def convert_unix_ts_bulk(timestamps, timezone="Europe/Berlin"):
+    """Vectorized version of :func:`convert_unix_ts` for many timestamps at once.
+
+    Requires the optional ``pandas`` dependency which can be installed with
+    ``python3 -m pip install flespi-gateway[pandas]``.
+
+    Parameters
+    ----------
+    timestamps : array_like of int
+        Unix times generated by flespi platform, e.g. the ``timestamp`` fields of messages.
+
+    timezone : str
+        Time zone of the user. Defaults to: Europe/Berlin
+
+    Returns
+    -------
+    dates : numpy.ndarray of str
+        Human readable times with a following format: %Y-%m-%d %H:%M:%S
+
+    Examples
+    --------
+    >>> messages = device.get_messages()['result']
+    >>> dates = convert_unix_ts_bulk([message['timestamp'] for message in messages])
+    """
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        raise ImportError(
+            "convert_unix_ts_bulk requires pandas: python3 -m pip install flespi-gateway[pandas]") from None
+    dates = pd.to_datetime(np.asarray(timestamps, dtype='int64'), unit='s', utc=True)
+    return dates.tz_convert(timezone).strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+
+
 def convert_human_ts(timestamp, timezone="Europe/Berlin"):
     """Utility function to help converting user given timestamp to flespi utc unix time.
 
@@ -45,13 +102,67 @@ def convert_human_ts(timestamp, timezone="Europe/Berlin"):
     date : int
         Unix timestamp.
 
+    Notes
+    -----
+    Local times that are ambiguous or do not exist because of a daylight saving
+    time transition are taken in standard time, e.g. ``'2021-10-31 02:30:00'``
+    in Europe/Berlin is 02:30 CET.
+
     Examples
     --------
     >>> ts = convert_human_ts('2021-01-02 10:00:00')
     >>> print(ts)
     1609578000
     """
-    timezone = pytz.timezone(timezone)
     date_time_obj = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-    timezone_date_time_obj = timezone.localize(date_time_obj)
+    timezone_date_time_obj = _localize(date_time_obj, _tz(timezone))
     return int(timezone_date_time_obj.timestamp())
+
+
+def convert_human_ts_bulk(timestamps, timezone="Europe/Berlin"):
+    """Vectorized version of :func:`convert_human_ts` for many timestamps at once.
+
+    Requires the optional ``pandas`` dependency which can be installed with
+    ``python3 -m pip install flespi-gateway[pandas]``.
+
+    Parameters
+    ----------
+    timestamps : array_like of str
+        Human readable timestamps in the format `2021-01-02 10:00:00`.
+
+    timezone : str
+        Time zone of the user. Defaults to: Europe/Berlin
+
+    Returns
+    -------
+    dates : numpy.ndarray of int
+        Unix timestamps.
+
+    Notes
+    -----
+    Times around daylight saving time transitions are handled like in :func:`convert_human_ts`.
+
+    Examples
+    --------
+    >>> starts = convert_human_ts_bulk(['2021-01-02 10:00:00', '2021-01-03 10:00:00'])
+    >>> print(starts)
+    [1609578000 1609664400]
+    """
+    try:
+        import numpy as np
+        import pandas as pd
+    except ImportError:
+        raise ImportError(
+            "convert_human_ts_bulk requires pandas: python3 -m pip install flespi-gateway[pandas]") from None
+    timestamps = pd.Series(timestamps)
+    dates = pd.to_datetime(timestamps, format='%Y-%m-%d %H:%M:%S')
+    # Ambiguous times are taken in standard time and the few nonexistent ones
+    # are converted one by one, exactly like convert_human_ts does.
+    dates = dates.dt.tz_localize(
+        timezone, ambiguous=np.zeros(len(dates), dtype=bool), nonexistent='NaT')
+    # Independent of the datetime resolution pandas picked for the series.
+    seconds = (dates - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    nonexistent = dates.isna()
+    if nonexistent.any():
+        seconds[nonexistent] = [convert_human_ts(timestamp, timezone) for timestamp in timestamps[nonexistent]]
+    return seconds.to_numpy(dtype='int64')
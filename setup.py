@@ -14,5 +14,17 @@ setuptools.setup(
     author_email='lavrikvladimir@gmail.com',
     license='BSD 3-Clause "New" or "Revised" License',
     packages=setuptools.find_packages(),
+    extras_require={
+        'async': ['aiohttp'],
+        'brotli': [
+            'brotli; platform_python_implementation == "CPython"',
+            'brotlicffi; platform_python_implementation != "CPython"',
+        ],
+        'fast': ['orjson'],
+        'http2': ['httpx[http2]'],
+        'pandas': ['pandas'],
+        'redis': ['redis'],
+        'stream': ['ijson'],
+    },
     zip_safe=False,
-    python_requires='>=3.6')
+    python_requires='>=3.7')
@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from flespi_gateway.async_gateway import AsyncDevice, aiohttp, gather_telemetry
+from flespi_gateway.gateway import FlespiAPIError
+
+TOKEN = 'x' * 64
+
+
+class FakeResponse:
+    def __init__(self, status=200, content=b'{"result": []}', headers=None):
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def read(self):
+        return self.content
+
+
+class FakeSession:
+    """Session answering GET requests with the queued `responses`, recording every call."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, link, params=None, headers=None):
+        self.calls.append((link, params, headers))
+        return self.responses.pop(0)
+
+    async def close(self):
+        pass
+
+
+def _device(session):
+    device = AsyncDevice(device_number=123456, flespi_token=TOKEN)
+    device._session = session
+    return device
+
+
+@unittest.skipIf(aiohttp is None, "requires aiohttp")
+class TestAsyncDevice(unittest.TestCase):
+    def test_session_timeout(self):
+        async def session_timeout():
+            async with AsyncDevice(device_number=123456, flespi_token=TOKEN, timeout=(1.5, 4)) as device:
+                return device._get_session().timeout
+
+        timeout = asyncio.run(session_timeout())
+        self.assertEqual((timeout.sock_connect, timeout.sock_read), (1.5, 4))
+
+    def test_identical_requests_share_one_response(self):
+        session = FakeSession([FakeResponse(content=b'{"result": [1]}')])
+        device = _device(session)
+
+        async def fetch_concurrently():
+            return await asyncio.gather(device.get_telemetry(), device.get_telemetry())
+
+        self.assertEqual(asyncio.run(fetch_concurrently()), [[1], [1]])
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(device._inflight, {})
+
+    def test_gather_all(self):
+        names = ['devices', 'messages', 'telemetry', 'connections', 'snapshots', 'logs', 'packets', 'settings']
+        session = FakeSession([FakeResponse(content=b'{"result": ["%s"]}' % name.encode()) for name in names])
+        device = _device(session)
+        self.assertEqual(asyncio.run(device.gather_all()), {name: [name] for name in names})
+        self.assertEqual([call[0] for call in session.calls], [
+            device._urls['self'], device._urls['messages'], device._urls['telemetry'],
+            device._urls['connections'], device._urls['snapshots'], device._urls['logs'],
+            device._urls['packets'], device._urls['settings']])
+
+
+@unittest.skipIf(aiohttp is None, "requires aiohttp")
+class TestConditionalRequests(unittest.TestCase):
+    def test_not_modified_serves_stored_body(self):
+        session = FakeSession([
+            FakeResponse(content=b'{"result": [1]}', headers={'ETag': '"v1"'}),
+            FakeResponse(304, b''),
+        ])
+        device = _device(session)
+
+        async def fetch_twice():
+            return await device.get_telemetry(), await device.get_telemetry()
+
+        self.assertEqual(asyncio.run(fetch_twice()), ([1], [1]))
+        self.assertIsNone(session.calls[0][2])
+        self.assertEqual(session.calls[1][2], {'If-None-Match': '"v1"'})
+
+    def test_messages_are_not_revalidated(self):
+        session = FakeSession([FakeResponse(headers={'ETag': '"v1"'}) for _ in range(2)])
+        device = _device(session)
+
+        async def fetch_twice():
+            return await device.get_messages(), await device.get_messages()
+
+        self.assertEqual(asyncio.run(fetch_twice()), ([], []))
+        self.assertEqual([call[2] for call in session.calls], [None, None])
+
+    def test_not_modified_without_validator(self):
+        device = _device(FakeSession([FakeResponse(304, b'')]))
+        with self.assertRaises(FlespiAPIError) as context:
+            asyncio.run(device.get_telemetry())
+        self.assertEqual(context.exception.status, 304)
+
+
+@unittest.skipIf(aiohttp is None, "requires aiohttp")
+class TestGatherTelemetry(unittest.TestCase):
+    async def gather(self):
+        from aiohttp import web
+
+        async def telemetry(request):
+            device_number = request.match_info['device_number']
+            if device_number == '2':
+                request.transport.close()
+            elif device_number == '3':
+                await asyncio.sleep(0.5)
+            return web.Response(body=b'{"result": [%s]}' % device_number.encode())
+
+        app = web.Application()
+        app.router.add_get('/{device_number}/telemetry/all', telemetry)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            with mock.patch('flespi_gateway.async_gateway.BASE_URL', f'http://127.0.0.1:{port}/'):
+                return await gather_telemetry([1, 2, 3], TOKEN, timeout=(1, 0.1))
+        finally:
+            await runner.cleanup()
+
+    def test_failed_devices_do_not_discard_results(self):
+        with self.assertLogs('flespi_gateway.async_gateway', 'ERROR'):
+            self.assertEqual(asyncio.run(self.gather()), {1: [1], 2: None, 3: None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from flespi_gateway.cache import MemoryCache, RedisBackend, SQLiteBackend, TieredBackend
+
+
+class TestMemoryCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache(maxsize=2)
+
+    def test_expiration(self):
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=100.0):
+            self.cache.setex('telemetry', 2.0, b'{}')
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=101.0):
+            self.assertEqual(self.cache.get('telemetry'), b'{}')
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=102.0):
+            self.assertIsNone(self.cache.get('telemetry'))
+            self.assertEqual(self.cache.get_stale('telemetry'), b'{}')
+
+    def test_lru_eviction(self):
+        self.cache.setex('a', 10, b'1')
+        self.cache.setex('b', 10, b'2')
+        self.cache.get('a')
+        self.cache.setex('c', 10, b'3')
+        self.assertIsNone(self.cache.get_stale('b'))
+        self.assertEqual(self.cache.get('a'), b'1')
+
+    def test_delete(self):
+        self.cache.setex('settings', 60, b'{}')
+        self.cache.delete('settings')
+        self.cache.delete('missing')
+        self.assertIsNone(self.cache.get_stale('settings'))
+
+    def test_delete_prefix(self):
+        self.cache.setex('a:1:settings', 60, b'{}')
+        self.cache.setex('a:2:settings', 60, b'{}')
+        self.cache.delete_prefix('a:1:')
+        self.assertIsNone(self.cache.get_stale('a:1:settings'))
+        self.assertEqual(self.cache.get('a:2:settings'), b'{}')
+
+
+class FakeRedis:
+    """Dictionary-backed stand-in for the ``redis.Redis`` methods used by RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def psetex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        # Redis glob patterns: a backslash escapes the next character.
+        regex = ''
+        for escaped, char_class, wildcard, char in re.findall(r'\\(.)|(\[[^\]]*\])|([*?])|(.)', match):
+            if char_class:
+                regex += char_class
+            elif wildcard:
+                regex += '.*' if wildcard == '*' else '.'
+            else:
+                regex += re.escape(escaped or char)
+        return iter([key for key in self.data if re.fullmatch(regex, key)])
+
+
+class TestRedisBackend(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeRedis()
+        self.cache = RedisBackend(self.client)
+
+    def test_setex_get_delete(self):
+        self.cache.setex('telemetry', 1.5, b'{}')
+        self.cache.setex('logs', 0.0001, b'[]')
+        self.assertEqual(self.client.ttls, {'flespi:telemetry': 1500, 'flespi:logs': 1})
+        self.assertEqual(self.cache.get('telemetry'), b'{}')
+        self.cache.delete('telemetry')
+        self.assertIsNone(self.cache.get('telemetry'))
+        self.assertEqual(self.cache.get('logs'), b'[]')
+
+    def test_delete_prefix_escapes_glob_characters(self):
+        for key in ('a*[1]:settings', 'a*[1]:telemetry', 'ab1:settings', 'a*[2]:settings'):
+            self.cache.setex(key, 60, b'{}')
+        self.cache.delete_prefix('a*[1]:')
+        self.assertEqual(sorted(self.client.data), ['flespi:a*[2]:settings', 'flespi:ab1:settings'])
+        self.cache.delete_prefix('missing:')
+
+
+class TestTieredBackend(unittest.TestCase):
+    def test_l2_hit_populates_l1(self):
+        l2 = MemoryCache()
+        cache = TieredBackend(l2)
+        l2.setex('telemetry', 10, b'{}')
+        self.assertEqual(cache.get('telemetry'), b'{}')
+        l2.clear()
+        self.assertEqual(cache.get('telemetry'), b'{}')
+
+    def test_setex_writes_both_levels(self):
+        cache = TieredBackend(MemoryCache())
+        cache.setex('logs', 30, b'[]')
+        self.assertEqual(cache.l1.get('logs'), b'[]')
+        self.assertEqual(cache.l2.get('logs'), b'[]')
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'cache.sqlite')
+
+    def test_entries_survive_reopening(self):
+        with mock.patch('flespi_gateway.cache.time.time', return_value=100.0):
+            cache = SQLiteBackend(self.path)
+            cache.setex('settings', 60, b'{}')
+            cache.close()
+        cache = SQLiteBackend(self.path)
+        self.addCleanup(cache.close)
+        with mock.patch('flespi_gateway.cache.time.time', return_value=159.0):
+            self.assertEqual(cache.get('settings'), b'{}')
+        with mock.patch('flespi_gateway.cache.time.time', return_value=160.0):
+            self.assertIsNone(cache.get('settings'))
+            self.assertEqual(cache.get_stale('settings'), b'{}')
+        cache.delete('settings')
+        self.assertIsNone(cache.get_stale('settings'))
+
+    def test_delete_prefix(self):
+        cache = SQLiteBackend(self.path)
+        self.addCleanup(cache.close)
+        cache.setex('a:1:settings', 60, b'{}')
+        cache.setex('a_1:settings', 60, b'{}')
+        cache.delete_prefix('a:1:')
+        self.assertIsNone(cache.get_stale('a:1:settings'))
+        self.assertEqual(cache.get('a_1:settings'), b'{}')
+
+    def test_maxsize(self):
+        cache = SQLiteBackend(self.path, maxsize=2)
+        self.addCleanup(cache.close)
+        cache.setex('settings', 60, b'1')
+        cache.setex('telemetry', 2, b'2')
+        cache.setex('logs', 30, b'3')
+        self.assertIsNone(cache.get_stale('telemetry'))
+        self.assertEqual(cache.get('settings'), b'1')
+        self.assertEqual(cache.get('logs'), b'3')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,28 @@
+import importlib.util
+import io
+import sys
+import tempfile
+import threading
+import time
 import unittest
 import os
-from flespi_gateway.gateway import Device
+from unittest import mock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+import requests
+
+from flespi_gateway import gateway
+from flespi_gateway.cache import MemoryCache
+from flespi_gateway.gateway import Device, FlespiAPIError
+
+TOKEN = 'x' * 64
 
 
 class TestDevice(unittest.TestCase):
@@ -14,5 +36,394 @@ class TestDevice(unittest.TestCase):
         self.assertIsInstance(telemetry, dict)
 
 
+class FakeResponse:
+    def __init__(self, status_code=200, content=b'{"result": []}', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.raw = io.BytesIO(content)
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            self.chunks_read += 1
+            yield self.content[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class FakeSession:
+    """Session answering GET requests with ``respond(link, params, headers)``, recording every call."""
+
+    def __init__(self, respond=None):
+        self.respond = respond or (lambda link, params, headers: FakeResponse())
+        self.calls = []
+
+    def get(self, link, params=None, headers=None, timeout=None, stream=False):
+        self.calls.append((link, params, headers))
+        return self.respond(link, params, headers)
+
+    def close(self):
+        pass
+
+
+def _device(session, token=TOKEN, **kwargs):
+    return Device(device_number=123456, flespi_token=token, session=session, **kwargs)
+
+
+def _load_gateway_without_orjson():
+    # A separate copy of the module, so the one used by other tests keeps its encoder.
+    spec = importlib.util.spec_from_file_location(
+        'flespi_gateway._gateway_without_orjson', gateway.__file__)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'orjson': None}):
+        spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestEncodeParams(unittest.TestCase):
+    def assert_encodes_numpy_scalars(self, module):
+        params = {'from': np.int64(1609578000), 'to': np.longlong(1609581600)}
+        self.assertEqual(module._encode_params(params),
+                         {'data': '{"from":1609578000,"to":1609581600}'})
+
+    def test_numpy_scalars(self):
+        self.assert_encodes_numpy_scalars(gateway)
+
+    def test_numpy_scalars_without_orjson(self):
+        self.assert_encodes_numpy_scalars(_load_gateway_without_orjson())
+
+
+class TestParams(unittest.TestCase):
+    def test_pairs(self):
+        self.assertEqual(gateway._encode_params([('data', '{"from":1}')]), {'data': '{"from":1}'})
+        self.assertEqual(gateway._encode_params([('from', 1)]), {'data': '{"from":1}'})
+
+    def test_get_messages_sends_params(self):
+        session = FakeSession()
+        _device(session).get_messages(params={'from': 1609578000})
+        self.assertEqual(session.calls[0][1], {'data': '{"from":1609578000}'})
+
+    def test_get_logs_accepts_pairs(self):
+        session = FakeSession()
+        _device(session).get_logs(params=[('data', '{"from":1609578000}')])
+        self.assertEqual(session.calls[0][1], {'data': '{"from":1609578000}'})
+
+
+class TestErrors(unittest.TestCase):
+    def test_unsuccessful_status(self):
+        errors = [{'code': 1, 'reason': 'Access denied'}]
+        session = FakeSession(lambda *args: FakeResponse(403, b'{"errors": [{"code": 1, "reason": "Access denied"}]}'))
+        with self.assertRaises(FlespiAPIError) as context:
+            _device(session).get_telemetry()
+        self.assertEqual(context.exception.status, 403)
+        self.assertEqual(context.exception.errors, errors)
+
+    def test_body_without_errors_object(self):
+        for content in (b'[1]', b'not json'):
+            session = FakeSession(lambda *args: FakeResponse(400, content))
+            with self.assertRaises(FlespiAPIError) as context:
+                _device(session).get_telemetry()
+            self.assertEqual(context.exception.status, 400)
+            self.assertIsNone(context.exception.errors)
+
+
+class TestCache(unittest.TestCase):
+    def test_tokens_do_not_share_responses(self):
+        def respond(link, params, headers):
+            return FakeResponse(content=b'{"result": ["%s"]}' % headers['Authorization'][-1].encode())
+
+        session = FakeSession(respond)
+        cache = MemoryCache()
+        first = _device(session, token='a' * 64, cache=cache)
+        second = _device(session, token='b' * 64, cache=cache)
+        self.assertEqual(first.get_devices(all=True), {'result': ['a']})
+        self.assertEqual(second.get_devices(all=True), {'result': ['b']})
+        self.assertEqual(first.get_devices(all=True), {'result': ['a']})
+        self.assertEqual(len(session.calls), 2)
+        self.assertFalse(any('a' * 64 in key or 'b' * 64 in key for key in cache._data))
+
+    def test_fallback_on_transport_error(self):
+        responses = [FakeResponse(content=b'{"result": [1]}'), requests.ConnectionError('unreachable')]
+
+        def respond(link, params, headers):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        device = _device(FakeSession(respond))
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=100.0):
+            device.get_telemetry()
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=200.0), \
+                self.assertLogs('flespi_gateway.gateway', 'DEBUG') as logs:
+            self.assertEqual(device.get_telemetry(), {'result': [1]})
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG', 'WARNING'])
+        self.assertTrue(all(record.exc_info is None for record in logs.records))
+
+    def test_invalidate_cache_keeps_other_devices(self):
+        session = FakeSession()
+        cache = MemoryCache()
+        device = _device(session, cache=cache)
+        other = Device(device_number=654321, flespi_token=TOKEN, session=session, cache=cache)
+        device.get_settings()
+        other.get_settings()
+        device.invalidate_cache()
+        device.get_settings()
+        other.get_settings()
+        self.assertEqual([call[0] for call in session.calls], [
+            device._urls['settings'], other._urls['settings'], device._urls['settings']])
+
+
+class TestFetchMany(unittest.TestCase):
+    def test_default_time_window(self):
+        session = FakeSession()
+        _device(session).fetch_many(['logs', 'packets'])
+        self.assertEqual([call[1] for call in session.calls], [dict(gateway.DEFAULT_TIME_WINDOW_PARAMS)] * 2)
+
+    def test_rejected_endpoints_are_none(self):
+        def respond(link, params, headers):
+            if link.endswith('/connections/all'):
+                return FakeResponse(403, b'{"errors": [{"code": 1, "reason": "Access denied"}]}')
+            return FakeResponse(content=b'{"result": [1]}')
+
+        device = _device(FakeSession(respond))
+        with self.assertLogs('flespi_gateway.gateway', 'ERROR'):
+            results = device.fetch_many(['telemetry/all', 'connections/all', 'messages'])
+        self.assertEqual(results, {'telemetry/all': {'result': [1]}, 'connections/all': None,
+                                   'messages': {'result': [1]}})
+
+
+class TestPagedDevices(unittest.TestCase):
+    def test_pages(self):
+        def respond(link, params, headers):
+            if link == device._urls['all']:
+                return FakeResponse(content=b'{"result": [{"id": 1}, {"id": 2}, {"id": 3}]}')
+            if link.endswith('/3'):
+                return FakeResponse(500, b'')
+            selector = link.rsplit('/', 1)[1]
+            rows = ','.join('{"id": %s, "name": "d%s"}' % (number, number) for number in selector.split(','))
+            return FakeResponse(content=b'{"result": [%s]}' % rows.encode())
+
+        session = FakeSession(respond)
+        device = _device(session)
+        with self.assertLogs('flespi_gateway.gateway', 'ERROR'):
+            devices = device.get_devices_paged(page_size=2, workers=2)
+        self.assertEqual(devices, {'result': [{'id': 1, 'name': 'd1'}, {'id': 2, 'name': 'd2'}]})
+        self.assertEqual(session.calls[0][1], {'fields': 'id'})
+        self.assertEqual(sorted(call[0] for call in session.calls[1:]),
+                         [gateway.BASE_URL + '1,2', gateway.BASE_URL + '3'])
+
+
+class TestSingleFlight(unittest.TestCase):
+    def fetch_concurrently(self, device, threads=8):
+        results, errors = [], []
+
+        def fetch():
+            try:
+                results.append(device.get_telemetry())
+            except FlespiAPIError as e:
+                errors.append(e)
+
+        workers = [threading.Thread(target=fetch) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, errors
+
+    def test_concurrent_misses_make_one_request(self):
+        release = threading.Event()
+
+        def respond(link, params, headers):
+            release.wait()
+            return FakeResponse(content=b'{"result": [1]}')
+
+        session = FakeSession(respond)
+        threading.Timer(0.05, release.set).start()
+        results, errors = self.fetch_concurrently(_device(session))
+        self.assertEqual(len(session.calls), 1)
+        self.assertEqual(results, [{'result': [1]}] * 8)
+        self.assertEqual(errors, [])
+
+    def test_followers_refetch_when_leader_fails(self):
+        release = threading.Event()
+
+        def respond(link, params, headers):
+            if len(session.calls) == 1:
+                release.wait()
+                return FakeResponse(500, b'')
+            # Slow enough for all followers to miss the cache unless they wait for a new leader.
+            time.sleep(0.05)
+            return FakeResponse(content=b'{"result": [1]}')
+
+        session = FakeSession(respond)
+        threading.Timer(0.05, release.set).start()
+        results, errors = self.fetch_concurrently(_device(session))
+        self.assertEqual([error.status for error in errors], [500])
+        self.assertEqual(len(session.calls), 2)
+        self.assertEqual(results, [{'result': [1]}] * 7)
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def test_not_modified_serves_stored_body(self):
+        responses = [
+            FakeResponse(content=b'{"result": [1]}',
+                         headers={'ETag': '"v1"', 'Last-Modified': 'Sat, 02 Jan 2021 10:00:00 GMT'}),
+            FakeResponse(304, b''),
+        ]
+        session = FakeSession(lambda *args: responses.pop(0))
+        device = _device(session)
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=100.0):
+            self.assertEqual(device.get_telemetry(), {'result': [1]})
+        with mock.patch('flespi_gateway.cache.time.monotonic', return_value=200.0):
+            self.assertEqual(device.get_telemetry(), {'result': [1]})
+        self.assertNotIn('If-None-Match', session.calls[0][2])
+        self.assertEqual(session.calls[1][2]['If-None-Match'], '"v1"')
+        self.assertEqual(session.calls[1][2]['If-Modified-Since'], 'Sat, 02 Jan 2021 10:00:00 GMT')
+
+    def test_uncached_endpoints_are_not_revalidated(self):
+        session = FakeSession(lambda *args: FakeResponse(headers={'ETag': '"v1"'}))
+        device = _device(session, telemetry_ttl=0)
+        device.get_telemetry()
+        device.get_telemetry()
+        device.get_messages(params={'from': 1609578000})
+        self.assertTrue(all('If-None-Match' not in call[2] for call in session.calls))
+        self.assertEqual(device._validators._data, {})
+
+    def test_not_modified_without_validator(self):
+        session = FakeSession(lambda *args: FakeResponse(304, b''))
+        with self.assertRaises(FlespiAPIError) as context:
+            _device(session, telemetry_ttl=0).get_telemetry()
+        self.assertEqual(context.exception.status, 304)
+
+
+@unittest.skipIf(gateway.ijson is None, "requires ijson")
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(gateway, 'STREAM_CHUNK_SIZE', 8)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_items_are_yielded_while_receiving(self):
+        response = FakeResponse(content=b'{"result": [{"timestamp": 1.5, "event_code": 300}, '
+                                        b'{"timestamp": 2, "event_code": 301}]}')
+        session = FakeSession(lambda *args: response)
+        logs = _device(session).iter_logs()
+        self.assertEqual(next(logs), {'timestamp': 1.5, 'event_code': 300})
+        self.assertLess(response.chunks_read, len(response.content) // 8)
+        self.assertEqual(list(logs), [{'timestamp': 2, 'event_code': 301}])
+        self.assertEqual(session.calls[0][1], gateway._encode_params(gateway.DEFAULT_TIME_WINDOW_PARAMS))
+
+    def test_iter_messages_sends_params(self):
+        session = FakeSession(lambda *args: FakeResponse(content=b'{"result": [{"position.speed": 12.25}]}'))
+        messages = list(_device(session).iter_messages(params={'from': 1609578000}))
+        self.assertEqual(messages, [{'position.speed': 12.25}])
+        self.assertIsInstance(messages[0]['position.speed'], float)
+        self.assertEqual(session.calls[0][1], {'data': '{"from":1609578000}'})
+
+    def test_unsuccessful_status(self):
+        session = FakeSession(lambda *args: FakeResponse(403, b'{"errors": [{"code": 1, "reason": "Access denied"}]}'))
+        with self.assertRaises(FlespiAPIError) as context:
+            list(_device(session).iter_messages())
+        self.assertEqual(context.exception.status, 403)
+        self.assertEqual(context.exception.errors, [{'code': 1, 'reason': 'Access denied'}])
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = os.path.join(directory.name, 'snapshot.zip')
+        self.snapshots = [100]
+        self.session = FakeSession(self.respond)
+        self.device = _device(self.session, cache_ttl=0)
+        self.listing = self.device._urls['snapshots']
+
+    def respond(self, link, params, headers):
+        if link == self.listing:
+            return FakeResponse(content=b'{"result": [{"id": 123456, "snapshots": %s}]}'
+                                % str(self.snapshots).encode())
+        return FakeResponse(content=link.rsplit('/', 1)[1].encode())
+
+    def get_snapshot(self):
+        del self.session.calls[:]
+        self.device.get_snapshot(self.output)
+        with open(self.output, 'rb') as f:
+            return f.read(), sorted(call[0] for call in self.session.calls)
+
+    def test_latest_snapshot_is_downloaded_with_listing(self):
+        self.assertEqual(self.get_snapshot(), (b'100', [self.listing, self.listing + '/100']))
+        self.assertEqual(self.get_snapshot(), (b'100', [self.listing, self.listing + '/100']))
+
+    def test_newer_snapshot_reuses_confirming_listing(self):
+        self.get_snapshot()
+        self.snapshots = [100, 200]
+        self.assertEqual(self.get_snapshot(),
+                         (b'200', [self.listing, self.listing + '/100', self.listing + '/200']))
+
+
+class TestBatchGet(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(self.respond)
+        self.failing = {}
+        for target in (mock.patch.object(gateway, '_shared_session', return_value=self.session),
+                       mock.patch.object(gateway, 'BATCH_SIZE', 2)):
+            target.start()
+            self.addCleanup(target.stop)
+
+    def respond(self, link, params, headers):
+        selector = link[len(gateway.BASE_URL):].split('/', 1)[0]
+        failure = self.failing.get(selector)
+        if isinstance(failure, Exception):
+            raise failure
+        if failure is not None:
+            return FakeResponse(failure, b'')
+        rows = ','.join('{"id": %s}' % number for number in selector.split(','))
+        return FakeResponse(content=b'{"result": [%s]}' % rows.encode())
+
+    def test_chunks_device_numbers(self):
+        rows = gateway.batch_get('settings/all', iter([1, 2, 3, 4, 5]), TOKEN, params={'fields': 'name'})
+        self.assertEqual(rows, {number: {'id': number} for number in (1, 2, 3, 4, 5)})
+        self.assertEqual([call[0] for call in self.session.calls], [
+            gateway.BASE_URL + '1,2/settings/all',
+            gateway.BASE_URL + '3,4/settings/all',
+            gateway.BASE_URL + '5/settings/all'])
+        self.assertEqual({call[1]['data'] for call in self.session.calls}, {'{"fields":"name"}'})
+
+    def test_failed_chunks_are_omitted(self):
+        self.failing = {'1,2': requests.ConnectionError('unreachable'), '5': 500}
+        with self.assertLogs('flespi_gateway.gateway', 'ERROR') as logs:
+            rows = Device.get_telemetry_batch([1, 2, 3, 4, 5], TOKEN)
+        self.assertEqual(rows, {3: {'id': 3}, 4: {'id': 4}})
+        self.assertEqual(len(logs.records), 2)
+        self.assertTrue(all(call[0].endswith('/telemetry/all') for call in self.session.calls))
+        self.assertTrue(all(call[1] is None for call in self.session.calls))
+
+
+@unittest.skipIf(pd is None, "requires pandas")
+class TestMessagesToDataFrame(unittest.TestCase):
+    def test_all_fields(self):
+        device = _device(FakeSession())
+        messages = [{'timestamp': 1, 'speed': 10}, {'timestamp': 2, 'ident': 'a'}, {'timestamp': 3, 'speed': 30}]
+        with mock.patch.object(Device, 'iter_messages', return_value=iter(messages)):
+            df = device.messages_to_dataframe()
+        pd.testing.assert_frame_equal(df, pd.DataFrame(messages))
+
+    def test_selected_columns(self):
+        device = _device(FakeSession())
+        messages = [{'timestamp': 1, 'speed': 10}, {'timestamp': 2, 'ident': 'a'}, {'timestamp': 3, 'speed': 30}]
+        with mock.patch.object(Device, 'iter_messages', return_value=iter(messages)) as iter_messages:
+            df = device.messages_to_dataframe(params={'from': 1}, columns=['speed', 'timestamp', 'battery'])
+        iter_messages.assert_called_once_with({'from': 1})
+        pd.testing.assert_frame_equal(df, pd.DataFrame(
+            {'speed': [10, None, 30], 'timestamp': [1, 2, 3], 'battery': [None] * 3}))
+
+
 if __name__ == '__main__':
     unittest.main()
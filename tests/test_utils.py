@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+from flespi_gateway import utils
+from flespi_gateway.utils import convert_human_ts, convert_human_ts_bulk, convert_unix_ts, convert_unix_ts_bulk
+
+# Regular, ambiguous (end of DST) and nonexistent (start of DST) local times
+# in Europe/Berlin, America/New_York and Australia/Sydney.
+TIMESTAMPS = [
+    '2021-01-02 10:00:00', '2021-07-03 10:00:00',
+    '2021-10-31 02:30:00', '2021-03-28 02:30:00',
+    '2021-11-07 01:30:00', '2021-03-14 02:30:00',
+    '2021-04-04 02:30:00', '2021-10-03 02:30:00',
+]
+
+
+class TestConvertHumanTs(unittest.TestCase):
+    def test_conversion(self):
+        self.assertEqual(convert_human_ts('2021-01-02 10:00:00'), 1609578000)
+        self.assertEqual(convert_unix_ts(1609578000), '2021-01-02 10:00:00')
+
+    def test_dst_transitions_take_standard_time(self):
+        self.assertEqual(convert_human_ts('2021-10-31 02:30:00'), 1635643800)
+        self.assertEqual(convert_human_ts('2021-03-28 02:30:00'), 1616895000)
+
+    @unittest.skipIf(pytz is None, "requires pytz")
+    def test_matches_pytz(self):
+        for timezone in ('Europe/Berlin', 'America/New_York', 'Australia/Sydney'):
+            for timestamp in TIMESTAMPS:
+                date_time_obj = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+                self.assertEqual(
+                    utils._localize(date_time_obj, utils._tz(timezone)).timestamp(),
+                    pytz.timezone(timezone).localize(date_time_obj).timestamp(),
+                    (timezone, timestamp))
+
+    def test_rejects_other_formats(self):
+        for timestamp in ('2021-01-02', '2021-01-02T10:00:00', '2021-01-02 10:00:00+05:00'):
+            with self.assertRaises(ValueError):
+                convert_human_ts(timestamp)
+
+
+@unittest.skipIf(pd is None, "requires pandas")
+class TestConvertUnixTsBulk(unittest.TestCase):
+    def test_matches_convert_unix_ts(self):
+        for timezone in ('Europe/Berlin', 'America/New_York', 'Australia/Sydney'):
+            # Unix times an hour before, at and an hour after each transition.
+            timestamps = [convert_human_ts(timestamp, timezone) + offset
+                          for timestamp in TIMESTAMPS for offset in (-3600, 0, 3600)]
+            self.assertEqual(convert_unix_ts_bulk(timestamps, timezone).tolist(),
+                             [convert_unix_ts(timestamp, timezone) for timestamp in timestamps],
+                             timezone)
+
+    def test_empty(self):
+        self.assertEqual(convert_unix_ts_bulk([]).tolist(), [])
+
+
+@unittest.skipIf(pd is None, "requires pandas")
+class TestConvertHumanTsBulk(unittest.TestCase):
+    def test_matches_convert_human_ts(self):
+        for timezone in ('Europe/Berlin', 'America/New_York', 'Australia/Sydney'):
+            self.assertEqual(convert_human_ts_bulk(TIMESTAMPS, timezone).tolist(),
+                             [convert_human_ts(timestamp, timezone) for timestamp in TIMESTAMPS],
+                             timezone)
+
+
+if __name__ == '__main__':
+    unittest.main()